@@ -0,0 +1,86 @@
+"""SUM(Total) rollups the dashboard charts are built from.
+
+Each Aggregation can run as a GROUP BY on the database (so only the grouped
+rows cross the wire, like the queries in Analysis Queries.sql) or as a pandas
+groupby over an already-loaded frame. Both paths return the same shape: the
+group-by columns followed by the summed value, sorted by the group-by columns.
+"""
+from collections import namedtuple
+
+import pandas as pd
+
+import profiling
+from data_sources import DATASET_TABLES
+
+
+class Aggregation(namedtuple("Aggregation", ["dataset", "group_by", "value"])):
+    __slots__ = ()
+
+    def __new__(cls, dataset, group_by=(), value="Total"):
+        return super().__new__(cls, dataset, tuple(group_by), value)
+
+    @property
+    def label(self):
+        return f"{self.dataset} by {', '.join(self.group_by)}" if self.group_by else f"{self.dataset} total"
+
+    def to_sql(self, tables=DATASET_TABLES):
+        columns = ", ".join(self.group_by)
+        query = f"SELECT {columns + ', ' if columns else ''}SUM({self.value}) AS {self.value} FROM {tables[self.dataset]}"
+        if columns:
+            query += f" GROUP BY {columns}"
+        return query
+
+    def run_sql(self, conn, source):
+        with profiling.span("query", self.label):
+            return self._finish(source.read_sql(self.to_sql(source.tables), conn))
+
+    def apply(self, df):
+        with profiling.span("aggregate", self.label):
+            return self._apply(df)
+
+    def _apply(self, df):
+        values = pd.to_numeric(df[self.value], errors="coerce")
+        if not self.group_by:
+            return pd.DataFrame({self.value: [values.sum()]})
+        grouped = values.groupby([df[column] for column in self.group_by], observed=True).sum()
+        return self._finish(grouped.reset_index())
+
+    def _finish(self, result):
+        result[self.value] = pd.to_numeric(result[self.value], errors="coerce").fillna(0)
+        if self.group_by:
+            result = result.sort_values(list(self.group_by), ignore_index=True)
+        return result
+
+
+# --- Economy ---
+ECONOMY_BY_TYPE_GENDER = Aggregation('economy', ['Economy_Type', 'Gender_Type'])
+
+# --- Employment & Age ---
+NATURE_OF_WORK = Aggregation('nature_work', ['Employment_Type_Name'])
+JOBS_BY_OCCUPATION_AGE = Aggregation('main_jobs', ['Occupation_Type', 'Age_Range'])
+POPULATION_BY_AGE_GENDER = Aggregation('pop_age', ['Age_Range', 'Gender_Type'])
+POPULATION_BY_AGE = Aggregation('pop_age', ['Age_Range'])
+
+# --- Education ---
+EDUCATION_BY_STATUS_GENDER = Aggregation('education', ['Status', 'Gender_Type'])
+EDUCATION_BY_GOVERNORATE_STATUS = Aggregation('education', ['Governorate', 'Status'])
+
+# --- Geographical ---
+BY_GOVERNORATE = {
+    name: Aggregation(name, ['Governorate']) for name in ('education', 'pop_age', 'emp_age')
+}
+
+# --- Social Insurance ---
+INSURANCE_BY_TYPE = Aggregation('insurance', ['Insurance_Type'])
+JOBS_BY_OCCUPATION = Aggregation('main_job_sectors', ['Occupation_Type'])
+SECTOR_BY_AGE_GENDER = Aggregation('sector_age', ['Sector_Name', 'Age_Range', 'Gender_Type'])
+
+# --- 2030 Projections ---
+FREELANCERS_BY_SECTOR_GENDER = Aggregation('main_job_sectors', ['Sector', 'Gender_Type'])
+EDUCATION_BY_GOVERNORATE_GENDER_STATUS = Aggregation('education', ['Governorate', 'Gender_Type', 'Status'])
+EMPLOYMENT_BY_GOVERNORATE_GENDER = Aggregation('emp_age', ['Governorate', 'Gender_Type'])
+
+# --- Summary ---
+DATASET_TOTALS = {
+    name: Aggregation(name) for name in ('economy', 'pop_age', 'emp_age', 'education', 'insurance')
+}
@@ -0,0 +1,129 @@
+"""The analyses of `Techmical Codes/Analysis Queries.sql`, computed in pandas.
+
+Each function takes the flat tables its query reads, as the dashboard loads
+them, and returns the rows the query returns with the same columns and values.
+The SQL predates the Cleaned Data column names. Age_group is Age_Range here,
+Economy is Economy_Type, Mainjobs_sec is Occupation_Type and Gender is
+Gender_Type.
+
+- Sums are 64-bit integer sums, with NULL Totals counted as 0 as SUM skips them.
+- Percentages follow ROUND(x * 100.0 / y, 2) and CAST(... AS DECIMAL(10, 2)).
+  They are worked out in integer hundredths and rounded half away from zero,
+  as SQL Server rounds numerics, so no float rounding step can disagree with
+  the database.
+- The PopAndAge ⋈ EmpAndAge join keeps its multiplicity. Per key, each
+  side's sum is multiplied by the other side's row count, which is what
+  summing over the joined row pairs gives.
+- ROW_NUMBER() and RANK() order as in the queries. SQL Server breaks
+  ROW_NUMBER ties arbitrarily; here tied rows keep Economy_Type order.
+
+QUERIES lists the analyses by name with the datasets each reads.
+Analytics.query(name) memoizes them per data version.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+YOUTH_AGE_RANGES = ['<20', '<25', '<30']
+FREELANCE_SECTOR = 'SelfEmployed_Inside_Home'
+# PopAndAge's open-ended bracket, which EmpAndAge doesn't have
+EXCLUDED_POPULATION_AGE = '<65'
+
+
+def percentage(part, whole):
+    """ROUND(part * 100.0 / whole, 2) over integer arrays, half away from zero; 0 where whole is 0."""
+    part = np.asarray(part, dtype="int64")
+    whole = np.asarray(whole, dtype="int64")
+    divisor = np.where(whole == 0, 1, np.abs(whole))
+    # Hundredths of a percent: floor(|part| * 10000 / |whole| + 1/2)
+    hundredths = (20000 * np.abs(part) + divisor) // (2 * divisor)
+    return np.where(whole == 0, 0.0, np.sign(part) * np.sign(whole) * hundredths / 100)
+
+
+def _totals(df):
+    return pd.to_numeric(df['Total'], errors="coerce").fillna(0).astype("int64")
+
+
+def _sum_by(df, keys, name):
+    # GROUP BY keys with SUM(Total) AS name; NULL keys form their own group, as in SQL
+    sums = _totals(df).groupby([df[key] for key in keys], observed=True, dropna=False).sum()
+    return sums.rename(name).reset_index()
+
+
+def employment_by_age(emp_age):
+    """1- Employment per age group and its share of all employment."""
+    groups = _sum_by(emp_age, ['Age_Range'], 'group_total')
+    return groups.assign(percentage=percentage(groups['group_total'], groups['group_total'].sum()))
+
+
+def freelancer_share(main_job_sectors, sector=FREELANCE_SECTOR):
+    """2- Workers in the home self-employment sector and their share of all sectors."""
+    sectors = _sum_by(main_job_sectors, ['Sector'], 'total')
+    sectors = sectors.assign(percentage=percentage(sectors['total'], sectors['total'].sum()))
+    return sectors[sectors['Sector'] == sector].reset_index(drop=True)
+
+
+def youth_by_economy(economy_age):
+    """3- Under-30s per economic activity, their share of it, and activities numbered by that share."""
+    totals = _totals(economy_age)
+    ages = economy_age['Age_Range'].astype(object).str.strip()
+    grouped = pd.DataFrame({
+        'YouthTotal': totals.where(ages.isin(YOUTH_AGE_RANGES), 0),
+        'GrandTotal': totals,
+    }).groupby(economy_age['Economy_Type'], observed=True, dropna=False).sum()
+    result = grouped.reset_index().assign(
+        YouthPercentage=percentage(grouped['YouthTotal'], grouped['GrandTotal'])
+    )
+    order = np.argsort(-result['YouthPercentage'].to_numpy(), kind="stable")
+    rank = np.empty(len(result), dtype="int64")
+    rank[order] = np.arange(1, len(result) + 1)
+    return result.assign(rank=rank).sort_values('rank', ignore_index=True)
+
+
+def operating_by_governorate_age(pop_age, emp_age):
+    """4- Employed people as a percentage of the population, per governorate and age group."""
+    keys = ['Governorate', 'Age_Range', 'Gender_Type']
+
+    def side(df):
+        # SUM and row count per join key; NULL keys never match in a join
+        return _totals(df).groupby([df[key].astype(object) for key in keys]).agg(['sum', 'count'])
+
+    population = side(pop_age[pop_age['Age_Range'] != EXCLUDED_POPULATION_AGE])
+    employees = side(emp_age)
+    joined = population.join(employees, how="inner", lsuffix="_population", rsuffix="_employees")
+    combined = pd.DataFrame({
+        'total_employees': joined['sum_employees'] * joined['count_population'],
+        'total_population': joined['sum_population'] * joined['count_employees'],
+    }).groupby(level=['Governorate', 'Age_Range']).sum().reset_index()
+    population_totals = combined['total_population'].to_numpy()
+    return combined.assign(operating_percentage=np.where(
+        population_totals > 0, percentage(combined['total_employees'], population_totals), 0.0
+    )).sort_values(['Governorate', 'Age_Range'], ignore_index=True)
+
+
+def gender_by_main_job(main_jobs):
+    """6- Workers per gender in each main-job sector."""
+    return _sum_by(main_jobs, ['Occupation_Type', 'Gender_Type'], 'total_per_gender')
+
+
+def governorate_employment_rank(emp_age):
+    """7- Employees per governorate, ranked largest first (ties share a rank)."""
+    governorates = _sum_by(emp_age, ['Governorate'], 'Totalemployees')
+    rank = governorates['Totalemployees'].rank(method="min", ascending=False).astype("int64")
+    return governorates.assign(Rank=rank).sort_values(['Rank', 'Governorate'], ignore_index=True)
+
+
+Query = namedtuple("Query", ["title", "compute", "datasets"])
+
+QUERIES = {
+    'employment_by_age': Query("Employment share per age group", employment_by_age, ['emp_age']),
+    'freelancer_share': Query("Freelancers (self-employed inside home)", freelancer_share, ['main_job_sectors']),
+    'youth_by_economy': Query("Youth share per economic activity", youth_by_economy, ['economy_age_flat']),
+    'operating_by_governorate_age': Query(
+        "Operating percentage per governorate and age", operating_by_governorate_age, ['pop_age', 'emp_age']
+    ),
+    'gender_by_main_job': Query("Gender split per main-job sector", gender_by_main_job, ['main_jobs']),
+    'governorate_employment_rank': Query("Governorate employment rank", governorate_employment_rank, ['emp_age']),
+}
@@ -0,0 +1,321 @@
+"""What each dashboard section computes, without Streamlit.
+
+The functions below turn the section rollups (see aggregations.py) into the
+frames, series and numbers the charts and insight cards show. They are pure:
+frames in, new frames out, nothing drawn and nothing modified in place. Each
+section's results come back as a namedtuple.
+
+Analytics fetches the rollups a section needs through an `aggregate(agg)`
+callable and memoizes each section's results for one data version, so a rerun
+or a second session showing the same section does no pandas work at all. The
+dashboard passes its cached aggregate; scripts can run the same computations
+over frames they loaded themselves:
+
+    engine = Analytics.over_frames({"education": df})
+    engine.education().top_literacy
+"""
+import threading
+from collections import namedtuple
+
+import pandas as pd
+
+import geo
+import profiling
+from aggregations import (
+    BY_GOVERNORATE, DATASET_TOTALS, ECONOMY_BY_TYPE_GENDER, EDUCATION_BY_GOVERNORATE_GENDER_STATUS,
+    EDUCATION_BY_GOVERNORATE_STATUS, EDUCATION_BY_STATUS_GENDER, EMPLOYMENT_BY_GOVERNORATE_GENDER,
+    FREELANCERS_BY_SECTOR_GENDER, INSURANCE_BY_TYPE, JOBS_BY_OCCUPATION, JOBS_BY_OCCUPATION_AGE,
+    NATURE_OF_WORK, POPULATION_BY_AGE, POPULATION_BY_AGE_GENDER, SECTOR_BY_AGE_GENDER,
+)
+from analysis_queries import QUERIES
+from enrich import enrich
+from projections import seeds as projection_seeds
+
+
+# Coarse education levels in the order the Education charts list them (see enrich.EDUCATION_LEVELS)
+EDUCATION_LEVEL_ORDER = [
+    'Basic Literacy', 'Primary', 'Preparatory', 'Secondary',
+    'Technical', 'Diploma', 'University', 'Postgraduate', 'Special Education'
+]
+
+# Map dataset of each Geographical Analysis map type
+MAP_DATASETS = {
+    "Education Distribution": 'education',
+    "Population Heatmap": 'pop_age',
+    "Employment Heatmap": 'emp_age',
+}
+
+PIE_SLICES = 7
+WAFFLE_TILES = 100
+TOP_N = 10
+
+
+Economy = namedtuple("Economy", [
+    "summary",        # Economy_Type x Gender_Type rollup
+    "type_totals",    # Total per Economy_Short, largest first
+    "gender_totals",  # Total per Gender_Type
+    "type_slices",    # type_totals cut to the largest types + 'Others' for the donut
+    "top_male",       # 5 largest types for males, ascending for a horizontal bar chart
+    "top_female",
+    "gender_share",   # Male/Female fraction per type, types largest first
+    "total",
+])
+
+Employment = namedtuple("Employment", [
+    "nature_totals",      # Total per Employment_Type_Name, largest first (None if unavailable)
+    "nature_tiles",       # nature_totals as whole tiles out of WAFFLE_TILES
+    "jobs_by_age",        # Occupation_Type x Age_Range pivot (None if unavailable)
+    "population_by_age_gender",  # Age_Range x Gender_Type pivot (None if unavailable)
+    "population_by_age",  # Total per Age_Range, only computed when the pivot is unavailable
+])
+
+Education = namedtuple("Education", [
+    "status_gender",          # Status x Gender_Type rollup with Education_Level
+    "level_totals",           # Total per education level, levels with none left out
+    "level_by_gender",        # level x Gender_Type pivot, levels with none left out
+    "by_governorate",         # Governorate x level pivot with Total_Population and Literacy_Rate
+    "top_literacy",           # TOP_N governorates by Literacy_Rate
+    "top_higher_education",   # TOP_N governorates by University + Postgraduate
+    "gender_gap",             # level x Gender_Type pivot with Gender_Ratio (female per 100 males)
+    "top_technical_academic",  # TOP_N governorates by Technical + University + Secondary
+    "pyramid",                # level_totals, largest first
+    "top_statuses",           # 15 largest detailed statuses
+    "literacy_rate",          # national, in percent
+    "top_university_region",  # governorate with most university graduates, or "N/A"
+    "gender_parity",          # female per 100 males overall
+    "total",
+])
+
+Geography = namedtuple("Geography", [
+    "points",  # Governorate, Total, Gov_key, Gov_id, lat, lon per governorate found in the index
+    "top",     # 5 largest governorates
+    "values",  # Total per Gov_key for every governorate in the index, 0 where there is none
+])
+
+Insurance = namedtuple("Insurance", ["coverage", "jobs", "sector_hierarchy"])
+
+
+def economy(summary):
+    type_totals = summary.groupby("Economy_Short")["Total"].sum().sort_values(ascending=False)
+    gender_totals = summary.groupby("Gender_Type")["Total"].sum()
+
+    if len(type_totals) > PIE_SLICES:
+        type_slices = type_totals.nlargest(PIE_SLICES - 1)
+        type_slices['Others'] = type_totals.nsmallest(len(type_totals) - PIE_SLICES + 1).sum()
+    else:
+        type_slices = type_totals
+
+    def top_types(gender):
+        rows = summary[summary['Gender_Type'] == gender]
+        return rows.groupby('Economy_Short')['Total'].sum().nlargest(5).sort_values()
+
+    pivot = summary.pivot_table(index='Economy_Short', columns='Gender_Type', values='Total', aggfunc='sum').fillna(0)
+    pivot['Total_Sum'] = pivot.sum(axis=1)
+    pivot = pivot.sort_values('Total_Sum', ascending=False)
+    gender_share = pivot[['Male', 'Female']].divide(pivot['Total_Sum'], axis=0)
+
+    return Economy(
+        summary, type_totals, gender_totals, type_slices,
+        top_types('Male'), top_types('Female'), gender_share, summary["Total"].sum(),
+    )
+
+
+def nature_of_work(rollup):
+    """(totals largest first, whole tiles out of WAFFLE_TILES) per type of work."""
+    totals = rollup.set_index("Employment_Type_Name")["Total"].sort_values(ascending=False)
+    tiles = (totals / totals.sum() * WAFFLE_TILES).round().astype(int)
+    return totals, tiles
+
+
+def jobs_by_age(rollup):
+    return rollup.pivot_table(index="Occupation_Type", columns="Age_Range", values="Total", aggfunc="sum", fill_value=0)
+
+
+def population_by_age_gender(rollup):
+    return rollup.set_index(["Age_Range", "Gender_Type"])["Total"].unstack(fill_value=0)
+
+
+def education(status_gender, governorate_status):
+    levels = status_gender.groupby("Education_Level")["Total"].sum().reindex(EDUCATION_LEVEL_ORDER, fill_value=0)
+    levels = levels[levels > 0]
+
+    level_by_gender = status_gender.pivot_table(
+        index='Education_Level', columns='Gender_Type', values='Total', aggfunc='sum'
+    ).reindex(EDUCATION_LEVEL_ORDER, fill_value=0)
+    level_by_gender = level_by_gender[level_by_gender.sum(axis=1) > 0]
+
+    governorates = governorate_status.pivot_table(
+        index='Governorate', columns='Education_Level', values='Total', aggfunc='sum'
+    ).reindex(columns=EDUCATION_LEVEL_ORDER, fill_value=0)
+    governorates['Total_Population'] = governorates.sum(axis=1)
+    governorates['Literacy_Rate'] = (1 - (governorates['Basic Literacy'] / governorates['Total_Population'])) * 100
+
+    def top_by(columns):
+        present = [column for column in columns if column in governorates.columns]
+        if not present:
+            return (governorates['Total_Population'] * 0).nlargest(TOP_N)
+        return governorates[present].sum(axis=1).nlargest(TOP_N)
+
+    gender_gap = status_gender.pivot_table(
+        index='Education_Level', columns='Gender_Type', values='Total', aggfunc='sum'
+    ).reindex(EDUCATION_LEVEL_ORDER, fill_value=0)
+    # Ratio only where both genders have data
+    gender_gap['Gender_Ratio'] = 0.0
+    both = (gender_gap['Male'] > 0) & (gender_gap['Female'] > 0)
+    gender_gap.loc[both, 'Gender_Ratio'] = (gender_gap.loc[both, 'Female'] / gender_gap.loc[both, 'Male']) * 100
+    gender_gap = gender_gap[gender_gap.sum(axis=1) > 0]
+
+    basic_literacy = governorates['Basic Literacy'].sum() if 'Basic Literacy' in governorates.columns else 0
+    population = governorates['Total_Population'].sum()
+    female = status_gender.loc[status_gender['Gender_Type'] == 'Female', 'Total'].sum()
+    male = status_gender.loc[status_gender['Gender_Type'] == 'Male', 'Total'].sum()
+
+    return Education(
+        status_gender=status_gender,
+        level_totals=levels,
+        level_by_gender=level_by_gender,
+        by_governorate=governorates,
+        top_literacy=governorates.nlargest(TOP_N, 'Literacy_Rate')['Literacy_Rate'],
+        top_higher_education=top_by(['University', 'Postgraduate']),
+        gender_gap=gender_gap,
+        top_technical_academic=top_by(['Technical', 'University', 'Secondary']),
+        pyramid=levels.sort_values(ascending=False),
+        top_statuses=status_gender.groupby("Status")["Total"].sum().nlargest(15),
+        literacy_rate=(1 - (basic_literacy / population)) * 100 if population > 0 else 0,
+        top_university_region=governorates['University'].idxmax() if 'University' in governorates.columns else "N/A",
+        gender_parity=(female / male) * 100 if male > 0 else 0,
+        total=status_gender["Total"].sum(),
+    )
+
+
+def governorate_points(rollup):
+    """Total per governorate with its index row (Gov_key, Gov_id, lat, lon), governorates without one dropped.
+
+    Labels naming the same governorate (an alias, an Arabic name) are added up.
+    """
+    located = geo.locate(rollup)
+    totals = located.groupby('Gov_key', sort=False)['Total'].sum()
+    index = geo.INDEX.loc[totals.index]
+    return pd.DataFrame({
+        'Governorate': index['Gov_Name'].to_numpy(),
+        'Total': totals.to_numpy(),
+        'Gov_key': totals.index.to_numpy(),
+        'Gov_id': index['Gov_id'].to_numpy(),
+        'lat': index['lat'].to_numpy(),
+        'lon': index['lon'].to_numpy(),
+    })
+
+
+def geography(rollup):
+    points = governorate_points(rollup)
+    return Geography(
+        points,
+        points.nlargest(5, 'Total')[['Governorate', 'Total']],
+        points.set_index('Gov_key')['Total'].reindex(geo.INDEX.index, fill_value=0),
+    )
+
+
+class Analytics:
+    """Section results computed from `aggregate(agg) -> enriched rollup or None`, memoized for one data version.
+
+    `rows(dataset) -> DataFrame or None` gives the loaded rows the Analysis
+    Queries read (see analysis_queries.py). Make a new instance when the data
+    changes; `version` only labels which data this one was computed from.
+    """
+
+    def __init__(self, aggregate, version=None, rows=None):
+        self._aggregate = aggregate
+        self._rows = rows or (lambda dataset: None)
+        self.version = version
+        self._results = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def over_frames(cls, frames, version=None):
+        """Engine over {dataset: DataFrame} already in memory, rolled up with pandas."""
+        def aggregate(agg):
+            if agg.dataset not in frames:
+                return None
+            try:
+                return enrich(agg.apply(frames[agg.dataset]), agg.dataset)
+            except KeyError:
+                return None  # dataset doesn't have the grouped columns
+
+        return cls(aggregate, version, rows=frames.get)
+
+    def _memo(self, key, compute):
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+        # Computed outside the lock; two sessions racing on a miss both compute the same result
+        with profiling.span("compute", key if isinstance(key, str) else ":".join(key)):
+            result = compute()
+        with self._lock:
+            return self._results.setdefault(key, result)
+
+    def economy(self):
+        return self._memo("economy", lambda: economy(self._aggregate(ECONOMY_BY_TYPE_GENDER)))
+
+    def employment(self):
+        return self._memo("employment", self._employment)
+
+    def _employment(self):
+        nature = self._aggregate(NATURE_OF_WORK)
+        nature_totals, nature_tiles = nature_of_work(nature) if nature is not None else (None, None)
+        jobs = self._aggregate(JOBS_BY_OCCUPATION_AGE)
+        population = self._aggregate(POPULATION_BY_AGE_GENDER)
+        by_age = None
+        if population is None:
+            by_age = self._aggregate(POPULATION_BY_AGE).set_index('Age_Range')['Total']
+        return Employment(
+            nature_totals, nature_tiles,
+            jobs_by_age(jobs) if jobs is not None else None,
+            population_by_age_gender(population) if population is not None else None,
+            by_age,
+        )
+
+    def education(self):
+        return self._memo("education", lambda: education(
+            self._aggregate(EDUCATION_BY_STATUS_GENDER), self._aggregate(EDUCATION_BY_GOVERNORATE_STATUS)
+        ))
+
+    def geography(self, dataset):
+        return self._memo(("geography", dataset), lambda: geography(self._aggregate(BY_GOVERNORATE[dataset])))
+
+    def insurance(self):
+        return self._memo("insurance", lambda: Insurance(
+            self._aggregate(INSURANCE_BY_TYPE), self._aggregate(JOBS_BY_OCCUPATION), self._aggregate(SECTOR_BY_AGE_GENDER)
+        ))
+
+    def totals(self):
+        """{dataset: SUM(Total)}, 0 for a dataset that can't be summed."""
+        def compute():
+            results = {name: self._aggregate(agg) for name, agg in DATASET_TOTALS.items()}
+            return {name: result['Total'].iloc[0] if result is not None else 0 for name, result in results.items()}
+
+        return self._memo("totals", compute)
+
+    def query(self, name):
+        """Result of the Analysis Queries.sql analysis `name` (see QUERIES), or None if a table it reads is missing."""
+        query = QUERIES[name]
+
+        def compute():
+            tables = [self._rows(dataset) for dataset in query.datasets]
+            return None if any(table is None for table in tables) else query.compute(*tables)
+
+        return self._memo(("query", name), compute)
+
+    def projection_seeds(self):
+        """Starting point of the 2030 projections (see projections.py), or None if a rollup it needs is missing."""
+        def compute():
+            rollups = [
+                self._aggregate(agg) for agg in
+                (FREELANCERS_BY_SECTOR_GENDER, EDUCATION_BY_GOVERNORATE_GENDER_STATUS, EMPLOYMENT_BY_GOVERNORATE_GENDER)
+            ]
+            return None if any(rollup is None for rollup in rollups) else projection_seeds(*rollups)
+
+        return self._memo("projection_seeds", compute)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
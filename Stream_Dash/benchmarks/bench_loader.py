@@ -0,0 +1,81 @@
+"""Compare sequential vs pooled table loading against a local SQLite stand-in.
+
+    python benchmarks/bench_loader.py --rows 200000 --workers 4 --latency 50
+
+SQLite runs in-process, so --latency adds a per-query delay to model the ODBC
+round trip to SQL Server, which is what the pool overlaps.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import ConnectionPool, fetch_tables, load_tables  # noqa: E402
+from data_sources import DATASET_TABLES, SQLiteSource  # noqa: E402
+
+
+def build_database(path, rows):
+    rng = np.random.default_rng(0)
+    conn = sqlite3.connect(path)
+    for name in DATASET_TABLES:
+        pd.DataFrame({
+            'Governorate': rng.choice(['Cairo', 'Giza', 'Alexandria', 'Aswan'], rows),
+            'Gender_Type': rng.choice(['Male', 'Female'], rows),
+            'Age_Range': rng.choice(['<20', '<25', '<30', '<35', '<40'], rows),
+            'Total': rng.integers(0, 500_000, rows),
+        }).to_sql(name, conn, index=False)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="rows per table")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0, help="simulated round trip per query, in ms")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+        build_database(path, args.rows)
+        source = SQLiteSource(path, tables={name: f'"{name}"' for name in DATASET_TABLES})
+
+        def connect():
+            conn = source.connect()
+            if args.latency:
+                conn.set_trace_callback(lambda _: time.sleep(args.latency / 1000))
+            return conn
+
+        sequential = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            conn = connect()
+            fetch_tables(conn, source)
+            conn.close()
+            sequential.append(time.perf_counter() - start)
+
+        pool = ConnectionPool(connect, size=args.workers)
+        pooled = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            _, timings = load_tables(pool, source)
+            pooled.append(time.perf_counter() - start)
+        pool.close()
+
+    print(f"{len(source.tables)} tables x {args.rows:,} rows, {args.latency:g}ms latency, best of {args.repeat}")
+    print(f"  sequential      : {min(sequential):.3f}s")
+    print(f"  pooled ({args.workers} workers): {min(pooled):.3f}s")
+    print("  per-table (last pooled run):")
+    for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"    {name:<18}{seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Time every dashboard section over synthetic data scaled up from the real tables.
+
+    python benchmarks/bench_sections.py --scales 10 100 1000
+    python benchmarks/bench_sections.py --compare benchmarks/results/baseline.json
+    python benchmarks/bench_sections.py --backend plotly   # Plotly versions of the matplotlib charts
+
+Each dataset is the real table from `Cleaned Data/` resampled to `scale` times
+its rows, with the same columns and labels and jittered Totals, then compacted
+and enriched the way the app loads it. For each section the run records the
+best-of-`--repeat` time to compute its results (analytics.py, rolled up with
+pandas) and to draw and serialize each of its charts (charts.py), plus the
+peak memory traced during one extra pass. Before the sections, each of the
+app's modules and plotting libraries is imported in a fresh interpreter and
+its `-X importtime` breakdown recorded, since cold start is paid per worker.
+Results are written as JSON; --compare prints how a run moved against an
+earlier one.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import MAP_DATASETS, Analytics  # noqa: E402
+from cleaned_data import read_flat_tables  # noqa: E402
+from data_sources import DATASET_TABLES  # noqa: E402
+from enrich import enrich  # noqa: E402
+from normalize import compact_frames  # noqa: E402
+from star_schema import build_star_schema  # noqa: E402
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules whose cold import time is reported: the dashboard's own modules as
+# app.py imports them, then each heavy library a section loads on first use
+IMPORTS = [
+    "streamlit", "analytics", "charts", "figures", "snapshot",
+    "matplotlib.pyplot", "seaborn", "pywaffle", "plotly.express", "plotly_charts", "folium", "pyarrow.feather",
+]
+
+# (name, charts.SECTION_CHARTS key, compute(engine))
+SECTIONS = [
+    ("economy", "economy", lambda engine: engine.economy()),
+    ("employment", "employment", lambda engine: engine.employment()),
+    ("education", "education", lambda engine: engine.education()),
+    *[
+        (f"geography:{dataset}", "geography", lambda engine, dataset=dataset: engine.geography(dataset))
+        for dataset in MAP_DATASETS.values()
+    ],
+    ("insurance", "insurance", lambda engine: engine.insurance()),
+    ("summary", None, lambda engine: engine.totals()),
+]
+
+
+def templates():
+    """{dataset: the real table behind it}, read from the Cleaned Data workbooks."""
+    tables = read_flat_tables()
+    star, _ = build_star_schema(tables)
+    tables.update(star)
+    return {name: tables[table.split('.')[-1].strip('[]')] for name, table in DATASET_TABLES.items()}
+
+
+def synthesize(tables, scale, seed=0):
+    """Each table resampled to `scale` times its rows, Totals jittered by up to ±50%."""
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for name, df in tables.items():
+        rows = df.iloc[rng.integers(0, len(df), len(df) * scale)].reset_index(drop=True)
+        jitter = rng.uniform(0.5, 1.5, len(rows))
+        frames[name] = rows.assign(Total=(rows["Total"].to_numpy() * jitter).round().astype("int64"))
+    frames, _ = compact_frames(frames)
+    return {name: enrich(df, name) for name, df in frames.items()}
+
+
+def load_charts(backend="matplotlib"):
+    """charts.py (with plotly_charts.py's figures for backend="plotly"), or None and why when it can't be imported.
+
+    The installed plotting libraries are imported here, up front, so their
+    import time (reported separately by import_times) isn't counted as render
+    time. A missing one only skips the charts drawn with it (see run_section).
+    """
+    import charts
+    from lazy_imports import load_all
+
+    load_all(vars(charts))
+    if backend == "plotly":
+        try:
+            import plotly_charts
+        except ImportError as e:
+            return None, str(e)
+        return _Backend(charts, plotly_charts.CHARTS), None
+    return _Backend(charts, charts.CHARTS), None
+
+
+class _Backend:
+    """charts.py's registry with the functions of one rendering backend."""
+
+    def __init__(self, charts, functions):
+        self.STYLE = charts.STYLE
+        self.SECTION_CHARTS = {
+            group: {chart: functions.get(chart, draw) for chart, draw in draws.items()}
+            for group, draws in charts.SECTION_CHARTS.items()
+        }
+        self.economy_type_gender = functions.get("economy/type_gender_bar", charts.economy_type_gender)
+
+
+def import_times(modules=IMPORTS):
+    """{module: {"seconds", "slowest"}} for importing each module in a fresh interpreter, None if not installed.
+
+    Parsed from `python -X importtime`: "seconds" is the cumulative time of the
+    modules the import statement loaded (those already loaded at interpreter
+    startup left out), "slowest" the packages with the most time of their own.
+    """
+    def importtime(code):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=APP_DIR, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            return None
+        entries = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+                continue
+            own, cumulative, name = line[len("import time:"):].split("|")
+            # The name column is one space, then two more per level of nesting
+            entries.append((name[1:].rstrip(), int(own) / 1e6, int(cumulative) / 1e6))
+        return entries
+
+    startup = {name.strip() for name, _, _ in importtime("pass") or []}
+    times = {}
+    for module in modules:
+        entries = importtime(f"import {module}")
+        if entries is None:
+            times[module] = None
+            continue
+        loaded = [entry for entry in entries if entry[0].strip() not in startup]
+        times[module] = {
+            # Top-level entries (no indent) don't nest inside each other
+            "seconds": sum(cumulative for name, _, cumulative in loaded if not name.startswith(" ")),
+            "slowest": [[name.strip(), own] for name, own, _ in sorted(loaded, key=lambda e: -e[1])[:5]],
+        }
+    return times
+
+
+def serialize(fig):
+    """Turn a chart into what the browser receives; returns its size in bytes."""
+    from matplotlib.figure import Figure
+
+    from figures import render
+
+    if isinstance(fig, Figure):
+        return len(render(fig))
+    if hasattr(fig, "to_json"):  # Plotly
+        return len(fig.to_json())
+    return len(fig.get_root().render())  # folium
+
+
+def section_charts(charts, frames, group, result):
+    """{chart id: draw()} for one section's result."""
+    if charts is None or group is None:
+        return {}
+    draws = {chart: (lambda draw=draw: draw(result)) for chart, draw in charts.SECTION_CHARTS[group].items()}
+    if group == "economy":
+        # The one chart drawn from full rows rather than a rollup
+        draws["economy/type_gender_bar"] = lambda: charts.economy_type_gender(frames["economy"], result.type_totals.index)
+    return draws
+
+
+def best_of(repeat, function):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_section(frames, charts, name, group, compute, repeat, skipped):
+    # A fresh engine per call, so its memo doesn't turn repeats into lookups
+    prepare = best_of(repeat, lambda: compute(Analytics.over_frames(frames)))
+    result = compute(Analytics.over_frames(frames))
+    render = {}
+    for chart, draw in section_charts(charts, frames, group, result).items():
+        if chart in skipped:
+            continue
+        try:
+            render[chart] = best_of(repeat, lambda draw=draw: serialize(draw()))
+        except ImportError as e:
+            # Drawn with a plotting library that isn't installed; the section's other charts are still timed
+            skipped[chart] = str(e)
+            import matplotlib.pyplot as plt
+            plt.close("all")
+
+    tracemalloc.start()
+    try:
+        result = compute(Analytics.over_frames(frames))
+        for chart, draw in section_charts(charts, frames, group, result).items():
+            if chart not in skipped:
+                serialize(draw())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "prepare_seconds": prepare,
+        "render_seconds": render,
+        "total_seconds": prepare + sum(render.values()),
+        "peak_bytes": peak,
+    }
+
+
+def run(scales, repeat, sections=None, backend="matplotlib", imports=True):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    charts, missing = load_charts(backend)
+    if charts is not None:
+        matplotlib.pyplot.style.use(charts.STYLE)
+    # {chart: why} for the charts not rendered ("all" when the backend can't be imported)
+    skipped = {} if charts is not None else {"all": missing}
+
+    tables = templates()
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeat": repeat,
+        "backend": backend,
+        "charts_skipped": skipped,
+        "imports": {},
+        "scales": {},
+    }
+    if imports:
+        results["imports"] = import_times()
+        for module, timing in results["imports"].items():
+            if timing is None:
+                print(f"import  {module:<22}not installed")
+            else:
+                slowest = ", ".join(f"{name} {own * 1000:.0f}ms" for name, own in timing["slowest"][:3])
+                print(f"import  {module:<22}{timing['seconds']:8.3f}s  ({slowest})", flush=True)
+    for scale in scales:
+        start = time.perf_counter()
+        frames = synthesize(tables, scale)
+        scale_results = {
+            "synthesize_seconds": time.perf_counter() - start,
+            "rows": {name: len(df) for name, df in frames.items()},
+            "bytes": {name: int(df.memory_usage(deep=True).sum()) for name, df in frames.items()},
+            "sections": {},
+        }
+        for name, group, compute in SECTIONS:
+            if sections and name.split(":")[0] not in sections:
+                continue
+            scale_results["sections"][name] = run_section(frames, charts, name, group, compute, repeat, skipped)
+            section = scale_results["sections"][name]
+            print(
+                f"{scale:>6}x  {name:<22}prepare {section['prepare_seconds']:8.3f}s"
+                f"  render {sum(section['render_seconds'].values()):8.3f}s"
+                f"  peak {section['peak_bytes'] / 2**20:8.1f} MB",
+                flush=True,
+            )
+        results["scales"][str(scale)] = scale_results
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Print current/baseline time ratios per scale and section; returns how many exceed `threshold`."""
+    regressions = 0
+    for module, timing in current.get("imports", {}).items():
+        before = baseline.get("imports", {}).get(module)
+        if not timing or not before or not before["seconds"]:
+            continue
+        ratio = timing["seconds"] / before["seconds"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  <-- regression"
+            regressions += 1
+        print(f"import  {module:<22}{'seconds':<16}{ratio:6.2f}x{flag}")
+    for scale, scale_results in current["scales"].items():
+        before = baseline["scales"].get(scale, {}).get("sections", {})
+        for name, section in scale_results["sections"].items():
+            if name not in before:
+                continue
+            for metric in ("prepare_seconds", "total_seconds", "peak_bytes"):
+                if not before[name][metric]:
+                    continue
+                ratio = section[metric] / before[name][metric]
+                flag = ""
+                if ratio > threshold:
+                    flag = "  <-- regression"
+                    regressions += 1
+                print(f"{scale:>6}x  {name:<22}{metric:<16}{ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="row multipliers")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", choices=["matplotlib", "plotly"], default="matplotlib")
+    parser.add_argument("--sections", nargs="+", choices=sorted({name.split(":")[0] for name, _, _ in SECTIONS}))
+    parser.add_argument("--output", help="JSON results file (default: results/sections-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare this run with")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio flagged as a regression")
+    parser.add_argument("--no-imports", action="store_true", help="skip the cold import time report")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.repeat, args.sections, args.backend, imports=not args.no_imports)
+    if results["charts_skipped"]:
+        print(f"charts not rendered: {results['charts_skipped']}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"sections-{time.strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f"{regressions} measurements regressed by more than {args.threshold:g}x")
+
+
+if __name__ == "__main__":
+    main()
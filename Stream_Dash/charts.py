@@ -0,0 +1,504 @@
+"""The dashboard's charts, drawn from the section results in analytics.py.
+
+Each function returns a figure without displaying it: matplotlib Figures (the
+app renders them through its FigureCache), Plotly figures and a folium map.
+Keeping them out of app.py lets benchmarks and batch jobs draw the same charts
+without a browser.
+
+SECTION_CHARTS lists, per Analytics section, the charts drawn from that
+section's result alone, keyed by the chart ids the app caches them under;
+CHARTS maps every matplotlib chart id to its function. The plotting libraries
+are imported the first time a chart needs them (see lazy_imports.py), so
+importing this module is cheap.
+"""
+import numpy as np
+
+import geo
+from lazy_imports import LazyModule
+
+
+# Imported on first use, so each section only loads the libraries its charts draw with
+plt = LazyModule("matplotlib.pyplot")
+mcolors = LazyModule("matplotlib.colors")
+sns = LazyModule("seaborn")
+px = LazyModule("plotly.express")
+folium = LazyModule("folium")
+folium_plugins = LazyModule("folium.plugins")
+pywaffle = LazyModule("pywaffle")
+
+
+STYLE = 'dark_background'
+
+ECONOMY_COLORS = ['#D4AF37', '#8B5CF6', '#10B981', '#EF4444', '#3B82F6', '#F97316', '#EC4899']
+EDUCATION_COLORS = ['#D4AF37', '#8B5CF6', '#10B981', '#EF4444', '#3B82F6', '#F59E0B', '#EC4899', '#06B6D4', '#84CC16']
+GENDER_COLORS = ['#D4AF37', '#8B5CF6']  # Gold & Purple
+MALE_COLOR = '#3B82F6'
+FEMALE_COLOR = '#EC4899'
+
+
+# --- Economy ---
+
+def economy_types(economy):
+    pie_data = economy.type_slices
+    fig1, ax1 = plt.subplots(figsize=(8, 8))
+    wedges, texts, autotexts = ax1.pie(
+        pie_data.values,
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=ECONOMY_COLORS,
+        wedgeprops={'edgecolor': 'white', 'linewidth': 1.2, 'width': 0.4}
+    )
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    ax1.set_title("Economy Type Distribution (Top 6 + Others)", fontsize=16, fontweight='bold', color='#FFD700')
+    ax1.legend(wedges, pie_data.index,
+               title="Economy Type",
+               title_fontsize=12,
+               fontsize=10,
+               loc="center left",
+               bbox_to_anchor=(0.95, 0.5))
+    return fig1
+
+
+def economy_genders(economy):
+    gender_counts = economy.gender_totals
+    fig2, ax2 = plt.subplots(figsize=(8, 8))
+
+    # Donut chart with smoother edges and balanced layout
+    wedges, texts, autotexts = ax2.pie(
+        gender_counts.values,
+        labels=None,  # hide raw labels, we’ll handle them manually
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=GENDER_COLORS,
+        wedgeprops={'edgecolor': 'white', 'linewidth': 1.2, 'width': 0.35},
+        textprops={'color': 'white', 'fontweight': 'bold', 'fontsize': 12}
+    )
+
+    # Improve percentage text style
+    for autotext in autotexts:
+        autotext.set_color("#FFFFFF")  # black text on colored wedges
+        autotext.set_fontweight('bold')
+        autotext.set_fontsize(12)
+
+    # Add category labels (around the donut, clearer than overlapping)
+    for i, (label, wedge) in enumerate(zip(gender_counts.index, wedges)):
+        angle = (wedge.theta2 - wedge.theta1)/2. + wedge.theta1
+        x = np.cos(np.deg2rad(angle))
+        y = np.sin(np.deg2rad(angle))
+        ax2.text(
+            1.25 * x, 1.25 * y, label,
+            ha='center', va='center',
+            fontsize=13, fontweight='bold',
+            color='#FFD700'
+        )
+
+    # Add a nice center label showing total
+    total = gender_counts.sum()
+    ax2.text(
+        0, 0, f"Total\n{total:,}",
+        ha='center', va='center',
+        fontsize=15, fontweight='bold',
+        color='#D4AF37'
+    )
+
+    # Title
+    ax2.set_title(
+        "Overall Gender Distribution in Economy",
+        fontsize=16, fontweight='bold',
+        color='#FFD700', pad=25
+    )
+
+    # Add legend for clarity
+    ax2.legend(
+        gender_counts.index,
+        title="Gender",
+        title_fontsize=12,
+        fontsize=10,
+        loc="center left",
+        bbox_to_anchor=(1, 0, 0.5, 1)
+    )
+
+    plt.tight_layout()
+    return fig2
+
+
+def economy_type_gender(rows, type_order):
+    """Bar per economy type and gender over the full `rows` of the economy dataset."""
+    fig3, ax3 = plt.subplots(figsize=(12, 7))
+    sns.barplot(
+        data=rows,
+        x="Economy_Short", y="Total", hue="Gender_Type",
+        palette=GENDER_COLORS,
+        edgecolor='white', linewidth=0.6, ax=ax3,
+        order=type_order
+    )
+    ax3.set_title("Total Count by Economy Type & Gender", fontsize=18, fontweight='bold', color='#FFD700')
+    ax3.set_xlabel("Economy Type", fontweight='bold', color='white', fontsize=12)
+    ax3.set_ylabel("Total Count", fontweight='bold', color='white', fontsize=12)
+    ax3.tick_params(axis='x', rotation=45, labelcolor='white', labelsize=10)
+    ax3.tick_params(axis='y', labelcolor='white')
+    ax3.legend(title="Gender", title_fontsize=12, fontsize=10)
+    return fig3
+
+
+def _top_economy_types(values, title, color):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(
+        x=values.values, y=values.index,
+        palette=[color] * len(values),
+        ax=ax, edgecolor='white', linewidth=0.7
+    )
+    ax.set_title(title, fontsize=16, fontweight='bold', color='#FFD700')
+    ax.set_xlabel("Total Count", fontweight='bold', color='white')
+    ax.set_ylabel("Economy Type", fontweight='bold', color='white')
+    ax.tick_params(colors='white')
+    # Add value labels
+    for i, v in enumerate(values.values):
+        ax.text(v + (values.values.max() * 0.01), i, f'{v:,.0f}', color='white', va='center')
+    return fig
+
+
+def economy_top_male(economy):
+    return _top_economy_types(economy.top_male, "Top 5 Economy Types (Male)", MALE_COLOR)
+
+
+def economy_top_female(economy):
+    return _top_economy_types(economy.top_female, "Top 5 Economy Types (Female)", FEMALE_COLOR)
+
+
+def economy_gender_share(economy):
+    fig6, ax6 = plt.subplots(figsize=(12, 7))
+    economy.gender_share.plot(
+        kind='bar',
+        stacked=True,
+        ax=ax6,
+        color=GENDER_COLORS,
+        edgecolor='white',
+        linewidth=0.5
+    )
+    ax6.set_title("Gender Percentage by Economy Type", fontsize=18, fontweight='bold', color='#FFD700')
+    ax6.set_xlabel("Economy Type", fontweight='bold', color='white', fontsize=12)
+    ax6.set_ylabel("Percentage", fontweight='bold', color='white', fontsize=12)
+    ax6.legend(title="Gender", title_fontsize=11, fontsize=9, loc='center left', bbox_to_anchor=(1, 0.5))
+    ax6.tick_params(axis='x', rotation=45, labelcolor='white')
+    ax6.tick_params(axis='y', labelcolor='white')
+    ax6.yaxis.set_major_formatter(plt.FuncFormatter(lambda y, _: '{:.0%}'.format(y)))
+    return fig6
+
+
+# --- Employment & Age ---
+
+def nature_of_work(employment):
+    fig = plt.figure(
+        FigureClass=pywaffle.Waffle,
+        rows=5,
+        values=employment.nature_tiles.to_dict(),
+        figsize=(10, 6),
+        colors=["#D4AF37", "#8B5CF6", "#10B981", "#EF4444"],
+        title={"label": "Nature of Work Distribution", "loc": "center", "color": "white"}
+    )
+    plt.tight_layout()
+    return fig
+
+
+def jobs_heatmap(employment):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    sns.heatmap(employment.jobs_by_age, cmap="YlOrRd", annot=True, fmt=".0f", cbar_kws={'label': 'Total'}, ax=ax)
+    ax.set_title("Job Distribution by Occupation Type and Age Range", color='white', fontweight='bold')
+    ax.set_xlabel("Age Range", color='white', fontweight='bold')
+    ax.set_ylabel("Occupation Type", color='white', fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+
+def population_by_age(employment):
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    pop_pivot = employment.population_by_age_gender
+    if pop_pivot is not None:
+        pop_pivot.plot(kind="bar", stacked=True, ax=ax, width=0.8, color=['#D4AF37', '#8B5CF6'])
+        ax.set_title("Population Distribution by Age Range and Gender", color='white', fontweight='bold')
+        ax.set_xlabel("Age Range", color='white', fontweight='bold')
+        ax.set_ylabel("Total Population", color='white', fontweight='bold')
+        ax.legend(title="Gender", title_fontsize=12, fontsize=10)
+    else:
+        age_summary = employment.population_by_age
+        ax.bar(range(len(age_summary)), age_summary.values, color='#D4AF37', alpha=0.7)
+        ax.set_title("Population Distribution by Age Range", color='white', fontweight='bold')
+        ax.set_xlabel("Age Range", color='white', fontweight='bold')
+        ax.set_ylabel("Total Population", color='white', fontweight='bold')
+        ax.set_xticks(range(len(age_summary)))
+        ax.set_xticklabels(age_summary.index, rotation=45, color='white')
+
+    plt.tight_layout()
+    return fig
+
+
+# --- Education ---
+
+def education_levels(education):
+    level_counts = education.level_totals
+    fig1, ax1 = plt.subplots(figsize=(8, 8))
+    wedges, texts, autotexts = ax1.pie(
+        level_counts.values,
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=EDUCATION_COLORS[:len(level_counts)],
+        wedgeprops={'edgecolor': 'white', 'linewidth': 1.2}
+    )
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    ax1.set_title("Education Level Distribution", fontsize=16, fontweight='bold', color='#FFD700')
+    ax1.legend(level_counts.index, title="Education Level", title_fontsize=10, fontsize=9,
+               loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
+    return fig1
+
+
+def education_levels_by_gender(education):
+    fig2, ax2 = plt.subplots(figsize=(10, 8))
+    education.level_by_gender.plot(kind='bar', ax=ax2, color=['#D4AF37', '#8B5CF6'], edgecolor='white', linewidth=0.6)
+    ax2.set_title("Education Level Distribution by Gender", fontsize=16, fontweight='bold', color='#FFD700')
+    ax2.set_xlabel("Education Level", fontweight='bold', color='white')
+    ax2.set_ylabel("Total Count", fontweight='bold', color='white')
+    ax2.tick_params(axis='x', rotation=45, labelcolor='white')
+    ax2.tick_params(axis='y', labelcolor='white')
+    ax2.legend(title="Gender", title_fontsize=12, fontsize=10)
+    ax2.grid(axis='y', alpha=0.3, color='gray')
+    return fig2
+
+
+def _top_governorates(values, title, xlabel, color):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(x=values.values, y=values.index, palette=[color] * len(values),
+                ax=ax, edgecolor='white', linewidth=0.7)
+    ax.set_title(title, fontsize=14, fontweight='bold', color='#FFD700')
+    ax.set_xlabel(xlabel, fontweight='bold', color='white')
+    ax.set_ylabel("Governorate", fontweight='bold', color='white')
+    ax.tick_params(colors='white')
+    return fig
+
+
+def education_top_literacy(education):
+    return _top_governorates(
+        education.top_literacy, "Top 10 Governorates by Literacy Rate (%)", "Literacy Rate (%)", '#10B981'
+    )
+
+
+def education_higher(education):
+    return _top_governorates(
+        education.top_higher_education, "Top 10 Governorates - Higher Education Population",
+        "University & Postgraduate Students", '#8B5CF6',
+    )
+
+
+def education_gender_ratio(education):
+    gender_gap = education.gender_gap
+    fig5, ax5 = plt.subplots(figsize=(10, 6))
+    ax5.barh(gender_gap.index, gender_gap['Gender_Ratio'], color='#EC4899', edgecolor='white', linewidth=0.7)
+    ax5.axvline(x=100, color='#FFD700', linestyle='--', alpha=0.7, label='Gender Parity (100%)')
+    ax5.set_title("Female-to-Male Ratio by Education Level (%)", fontsize=14, fontweight='bold', color='#FFD700')
+    ax5.set_xlabel("Female/Male Ratio (%)", fontweight='bold', color='white')
+    ax5.set_ylabel("Education Level", fontweight='bold', color='white')
+    ax5.tick_params(colors='white')
+    ax5.legend()
+    return fig5
+
+
+def education_technical_academic(education):
+    fig6, ax6 = plt.subplots(figsize=(10, 6))
+    education.top_technical_academic.plot(kind='bar', ax=ax6, color='#F59E0B', edgecolor='white', linewidth=0.7)
+    ax6.set_title("Technical & Academic Education by Governorate", fontsize=14, fontweight='bold', color='#FFD700')
+    ax6.set_xlabel("Governorate", fontweight='bold', color='white')
+    ax6.set_ylabel("Total Students", fontweight='bold', color='white')
+    ax6.tick_params(axis='x', rotation=45, labelcolor='white')
+    ax6.tick_params(axis='y', labelcolor='white')
+    return fig6
+
+
+def education_pyramid(education):
+    pyramid_data = education.pyramid
+    fig7, ax7 = plt.subplots(figsize=(18, 14))
+    y_pos = range(len(pyramid_data))
+    ax7.barh(y_pos, pyramid_data.values, color=EDUCATION_COLORS[:len(pyramid_data)], edgecolor='white', linewidth=0.7)
+    ax7.set_yticks(y_pos)
+    ax7.set_yticklabels(pyramid_data.index)
+    ax7.set_title("Education Pyramid - Population by Level", fontsize=14, fontweight='bold', color='#FFD700')
+    ax7.set_xlabel("Total Population", fontweight='bold', color='white')
+    ax7.set_ylabel("Education Level", fontweight='bold', color='white')
+    ax7.tick_params(colors='white')
+    ax7.grid(axis='x', alpha=0.3, color='gray')
+    return fig7
+
+
+def education_statuses(education):
+    edu_status_counts = education.top_statuses
+    fig9, ax9 = plt.subplots(figsize=(12, 8))
+    sns.barplot(x=edu_status_counts.values, y=edu_status_counts.index, palette=EDUCATION_COLORS,
+                ax=ax9, edgecolor='white', linewidth=0.7)
+    ax9.set_title("Top 15 Detailed Education Status Categories", fontsize=16, fontweight='bold', color='#FFD700')
+    ax9.set_xlabel("Total Count", fontweight='bold', color='white')
+    ax9.set_ylabel("Education Status", fontweight='bold', color='white')
+    ax9.tick_params(colors='white')
+    return fig9
+
+
+# --- Geographical ---
+
+# Geographical Analysis map type -> (marker color, drawn as a heatmap)
+MAP_STYLES = {
+    "Education Distribution": ("#D4AF37", False),
+    "Population Heatmap": ("#FF4500", True),
+    "Employment Heatmap": ("#FFD700", True),
+}
+
+
+def governorate_map(geography, color="#D4AF37", heatmap=False):
+    points = geography.points
+    mymap = folium.Map(location=[26.8206, 30.8025], zoom_start=6, tiles="CartoDB positron")
+
+    if heatmap:
+        heat_data = points[['lat', 'lon', 'Total']].astype(float).to_numpy().tolist()
+        folium_plugins.HeatMap(heat_data, min_opacity=0.3, radius=25, blur=20, max_zoom=6).add_to(mymap)
+    else:
+        points = points[points['Total'] > 0]
+        radii = np.maximum(points['Total'].to_numpy(dtype=float) / 50000, 5)
+        for name, total, lat, lon, radius in zip(
+            points['Governorate'], points['Total'], points['lat'], points['lon'], radii
+        ):
+            folium.CircleMarker(
+                location=[lat, lon],
+                radius=radius,
+                popup=f"<b>{name}</b><br>Total: {total:,.0f}",
+                color=color,
+                fill=True,
+                fillColor=color,
+                fillOpacity=0.6,
+                tooltip=name
+            ).add_to(mymap)
+    return mymap
+
+
+def governorate_choropleth(geography, boundaries, cmap="YlOrRd"):
+    """Governorates filled by Total; `boundaries` is geo.boundaries(), {Gov_key: GeoJSON feature}."""
+    values = geography.values
+    names = geo.INDEX['Gov_Name']
+    # Fill colors come from one vectorized colormap call and are stored on the
+    # features with the tooltip text, so styling a feature is a property lookup
+    fills = plt.get_cmap(cmap)(mcolors.Normalize(0, max(values.max(), 1))(values.to_numpy()))
+    features = [
+        {**boundaries[key], "properties": {
+            "Gov_Name": names[key],
+            "Total": f"{total:,.0f}",
+            "fill": mcolors.to_hex(fill),
+        }}
+        for key, total, fill in zip(values.index, values.to_numpy(), fills) if key in boundaries
+    ]
+    mymap = folium.Map(location=[26.8206, 30.8025], zoom_start=6, tiles="CartoDB positron")
+    folium.GeoJson(
+        {"type": "FeatureCollection", "features": features},
+        style_function=lambda feature: {
+            "fillColor": feature["properties"]["fill"], "color": "white", "weight": 1, "fillOpacity": 0.75,
+        },
+        tooltip=folium.GeoJsonTooltip(fields=["Gov_Name", "Total"], aliases=["Governorate", "Total"]),
+    ).add_to(mymap)
+    return mymap
+
+
+# --- Social Insurance ---
+
+def insurance_coverage(insurance):
+    return px.pie(insurance.coverage, names="Insurance_Type", values="Total",
+                  title="Social Insurance Coverage Distribution",
+                  color_discrete_sequence=['#D4AF37', '#8B5CF6', '#10B981', '#EF4444'])
+
+
+def insurance_jobs(insurance):
+    fig = px.bar(insurance.jobs, x='Occupation_Type', y='Total',
+                 title="Employment by Job Sector",
+                 color_discrete_sequence=['#D4AF37'])
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+def insurance_sectors(insurance):
+    return px.sunburst(insurance.sector_hierarchy, path=["Sector_Name", "Age_Range", "Gender_Type"],
+                       values="Total", title="Sector, Age & Gender Hierarchy")
+
+
+# --- Summary Report ---
+
+def summary_report(totals, economy_records):
+    """The Summary Report card as an HTML page; `totals` is Analytics.totals(), {dataset: SUM(Total)}."""
+    return f"""
+<div style="background-color: rgba(20, 20, 20, 0.95); padding: 2rem; border-radius: 10px;">
+    <h3 style="color: #D4AF37; margin-bottom: 2rem;">📊 EMPLOYMENT IN EGYPT - ANALYSIS SUMMARY</h3>
+
+    <div style="color: #a0aec0; line-height: 2.5;">
+        <h4 style="color: #D4AF37;">🏢 ECONOMY & WORK:</h4>
+        <p>• Total records in Economy dataset: <strong style="color: #FFD700;">{economy_records:,}</strong></p>
+        <p>• Total employment figure: <strong style="color: #FFD700;">{totals.get('economy', 0):,}</strong></p>
+
+        <h4 style="color: #D4AF37;">👥 DEMOGRAPHICS:</h4>
+        <p>• Total population analyzed: <strong style="color: #FFD700;">{totals.get('pop_age', 0):,}</strong></p>
+
+        <h4 style="color: #D4AF37;">💼 EMPLOYMENT:</h4>
+        <p>• Total employment records: <strong style="color: #FFD700;">{totals.get('emp_age', 0):,}</strong></p>
+
+        <h4 style="color: #D4AF37;">🎓 EDUCATION:</h4>
+        <p>• Educational status records: <strong style="color: #FFD700;">{totals.get('education', 0):,}</strong></p>
+
+        <h4 style="color: #D4AF37;">🏥 SOCIAL INSURANCE:</h4>
+        <p>• Insurance coverage records: <strong style="color: #FFD700;">{totals.get('insurance', 0):,}</strong></p>
+    </div>
+
+    <div style="margin-top: 2rem; padding: 1rem; background: rgba(212, 175, 55, 0.1); border-radius: 8px; border-left: 4px solid #D4AF37;">
+        <h4 style="color: #D4AF37; margin: 0;">✅ Analysis Complete!</h4>
+        <p style="margin: 0.5rem 0 0 0; color: #a0aec0;">All visualizations show employment patterns, demographics, and economic indicators for Egypt.</p>
+    </div>
+</div>
+"""
+
+
+# Analytics section -> {chart id: draw(section result)}
+SECTION_CHARTS = {
+    "economy": {
+        "economy/type_donut": economy_types,
+        "economy/gender_donut": economy_genders,
+        "economy/top_male": economy_top_male,
+        "economy/top_female": economy_top_female,
+        "economy/gender_share": economy_gender_share,
+    },
+    "employment": {
+        "employment/nature_of_work": nature_of_work,
+        "employment/jobs_heatmap": jobs_heatmap,
+        "employment/population_by_age": population_by_age,
+    },
+    "education": {
+        "education/level_pie": education_levels,
+        "education/level_by_gender": education_levels_by_gender,
+        "education/top_literacy": education_top_literacy,
+        "education/higher_education": education_higher,
+        "education/gender_ratio": education_gender_ratio,
+        "education/technical_academic": education_technical_academic,
+        "education/pyramid": education_pyramid,
+        "education/status_detail": education_statuses,
+    },
+    "geography": {
+        "geography/map": governorate_map,
+    },
+    "insurance": {
+        "insurance/coverage": insurance_coverage,
+        "insurance/jobs": insurance_jobs,
+        "insurance/sectors": insurance_sectors,
+    },
+}
+
+# Chart id -> draw(...) for every matplotlib chart; plotly_charts.CHARTS has the same ids and arguments
+CHARTS = {
+    **{chart: draw for group in ("economy", "employment", "education") for chart, draw in SECTION_CHARTS[group].items()},
+    "economy/type_gender_bar": economy_type_gender,
+}
@@ -0,0 +1,160 @@
+"""Read the `Cleaned Data/` workbooks into the flat tables the dashboard queries.
+
+Each flat table is named after its SQL Server counterpart and has the same
+English columns and labels (Governorate, Gender_Type, Age_Range, Total, ...),
+so the embedded backend can serve the dashboard without SQL Server.
+"""
+import glob
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+from labels import (
+    AGE_BANDS, AREA_TYPES, ECONOMY_TYPES, EDUCATION_STATUS, GENDERS, GOVERNORATE_NAMES, INSURANCE_TYPES,
+    NATURE_OF_WORK, OCCUPATIONS, SECTORS, WORK_STATUS, normalize_label, translate,
+)
+from workbook_reader import read_sheet
+
+
+CLEANED_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Cleaned Data")
+
+# Office writes `~$name.xlsx` lock files next to open workbooks and `~name.tmp`
+# copies while saving; LibreOffice and sync tools leave hidden `.name` files
+LOCK_FILE_PREFIXES = ("~", ".")
+WORKBOOK_EXTENSION = ".xlsx"
+
+TOTAL_HEADERS = {normalize_label(header) for header in ("الإجمالي", "اجمالي")}
+
+
+# A long-format sheet: one row per category combination and a total column.
+# `columns` maps the Arabic header to (English column, labels or None).
+LongSheet = namedtuple("LongSheet", ["workbook", "sheet", "columns"])
+
+FLAT_TABLES = {
+    'Economy_And_LifeOfWork': LongSheet("8 عدد", "Sheet1", {
+        "أقسام النشاط الإقتصادى الرئيسية": ("Economy_Type", ECONOMY_TYPES),
+        "النوع": ("Gender_Type", GENDERS),
+        "الحالة العملية ( 15 سنة فأكثر )": ("Status", WORK_STATUS),
+    }),
+    'EconomyAndAge': LongSheet("النشاط الاقتصادي و فئات السن", "Sheet1", {
+        "أقسام النشاط الإقتصادى الرئيسية": ("Economy_Type", ECONOMY_TYPES),
+        "النوع": ("Gender_Type", GENDERS),
+        "نوع السكن": ("Area_Type", AREA_TYPES),
+        "فئات السن ( 15 سنة فأكثر )": ("Age_Range", None),
+    }),
+    'Emp&Age': LongSheet("طبقاً لفئات الســــــن", "Sheet2", {
+        "المحافظة": ("Governorate", GOVERNORATE_NAMES),
+        "النوع": ("Gender_Type", GENDERS),
+        "الفئة العمرية": ("Age_Range", None),
+    }),
+    'MainjobsSecAndAge': LongSheet("15عدد", "شغال 15+", {
+        "أقسام المهن الرئيسية": ("Occupation_Type", OCCUPATIONS),
+        "النوع": ("Gender_Type", GENDERS),
+        "فئات السن ( 15 سنة فأكثر )": ("Age_Range", None),
+    }),
+    'NatureOfWork': LongSheet("9 عدد", "Sheet2", {
+        "المحافظة": ("Governorate", GOVERNORATE_NAMES),
+        "النوع": ("Gender_Type", GENDERS),
+        "طبيعة العمل": ("Employment_Type_Name", NATURE_OF_WORK),
+    }),
+    'PopAndAge': LongSheet("التعداد طبقا للفئات السنية", "Sheet1", {
+        "المحافظة": ("Governorate", GOVERNORATE_NAMES),
+        "النوع": ("Gender_Type", GENDERS),
+        "الفئة العمرية": ("Age_Range", None),
+    }),
+    'Educational_Status': LongSheet("طبقاً للحالة التعليمية", "Sheet1", {
+        "المحافظة": ("Governorate", GOVERNORATE_NAMES),
+        "النوع": ("Gender_Type", GENDERS),
+        "الحالة التعليمية": ("Status", EDUCATION_STATUS),
+    }),
+    'Social_Insurance': LongSheet("11عــدد", "Sheet1", {
+        "المحافظة": ("Governorate", GOVERNORATE_NAMES),
+        "النوع": ("Gender_Type", GENDERS),
+        "التأمينات الإجتماعية": ("Insurance_Type", INSURANCE_TYPES),
+    }),
+    # Occupations here are the 128 detailed ISCO sub-major groups; they have no
+    # English labels yet and are kept in Arabic.
+    'MainJobAndSectors': LongSheet("Copy of 16", "Sheet2", {
+        "أبواب المهن الرئيسية": ("Occupation_Type", None),
+        "النوع": ("Gender_Type", GENDERS),
+        "القطاع ( 15 سنة فأكثر )": ("Sector", SECTORS),
+    }),
+    'Sector&Age': "sector_age",  # wide CAPMAS table, see _read_sector_age
+}
+
+SECTOR_AGE_WORKBOOK = "القطاع و"
+
+
+def is_workbook(path):
+    name = os.path.basename(path)
+    return name.lower().endswith(WORKBOOK_EXTENSION) and not name.startswith(LOCK_FILE_PREFIXES)
+
+
+def workbook_path(prefix, folder=CLEANED_DATA_DIR):
+    matches = [path for path in workbook_files(folder) if os.path.basename(path).startswith(prefix)]
+    if len(matches) != 1:
+        raise FileNotFoundError(f"expected one workbook starting with {prefix!r} in {folder}, found {len(matches)}")
+    return matches[0]
+
+
+def workbook_files(folder=CLEANED_DATA_DIR):
+    return sorted(path for path in glob.glob(os.path.join(folder, "*")) if is_workbook(path))
+
+
+def flat_table_workbook(table, folder=CLEANED_DATA_DIR):
+    """Path of the workbook flat table `table` is read from."""
+    spec = FLAT_TABLES[table]
+    return workbook_path(SECTOR_AGE_WORKBOOK if spec == "sector_age" else spec.workbook, folder)
+
+
+def _whole_totals(df):
+    # The workbook reader gives numbers as float64; head counts go back to integers
+    if (df["Total"] % 1 == 0).all():
+        return df.assign(Total=df["Total"].astype("int64"))
+    return df
+
+
+def _read_long(spec, folder):
+    raw = read_sheet(workbook_path(spec.workbook, folder), spec.sheet)
+    headers = {normalize_label(column): column for column in raw.columns}
+    frame = {}
+    for header, (column, labels) in spec.columns.items():
+        values = raw[headers[normalize_label(header)]]
+        frame[column] = translate(values, labels) if labels else values.astype(str).str.strip()
+    total = next(column for key, column in headers.items() if key in TOTAL_HEADERS)
+    frame["Total"] = pd.to_numeric(raw[total], errors="coerce")
+    return _whole_totals(pd.DataFrame(frame).dropna(subset=["Total"]))
+
+
+def _read_sector_age(folder):
+    # Rows: sector (merged cell) / area (urban, rural, total) / gender (m, f, total)
+    # Columns: one per age band, with the band headers on row 5.
+    raw = read_sheet(workbook_path(SECTOR_AGE_WORKBOOK, folder), "4", header=None)
+    bands = {i: AGE_BANDS[str(label).strip()] for i, label in raw.iloc[5].items() if str(label).strip() in AGE_BANDS}
+    body = raw.iloc[6:].copy()
+    body[0] = body[0].ffill()
+    body[1] = body[1].ffill()
+    body = body[
+        (body[1].map(normalize_label) == normalize_label("جملة"))  # both areas
+        & body[2].map(normalize_label).isin({normalize_label("ذكور"), normalize_label("إناث")})
+        & (body[0].map(normalize_label) != normalize_label("اجمالى الجمهورية"))
+    ]
+    long = body[[0, 2, *bands]].melt(id_vars=[0, 2], var_name="band", value_name="Total")
+    return _whole_totals(pd.DataFrame({
+        "Sector_Name": translate(long[0], SECTORS),
+        "Age_Range": long["band"].map(bands),
+        "Gender_Type": translate(long[2], GENDERS),
+        "Total": pd.to_numeric(long["Total"], errors="coerce"),
+    }).dropna(subset=["Total"]).reset_index(drop=True))
+
+
+def read_flat_table(table, folder=CLEANED_DATA_DIR):
+    spec = FLAT_TABLES[table]
+    if spec == "sector_age":
+        return _read_sector_age(folder)
+    return _read_long(spec, folder)
+
+
+def read_flat_tables(folder=CLEANED_DATA_DIR):
+    return {table: read_flat_table(table, folder) for table in FLAT_TABLES}
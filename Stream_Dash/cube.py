@@ -0,0 +1,119 @@
+"""Materialized rollup cube over a dataset's dimension columns.
+
+The finest grouping of a dataset (e.g. Governorate x Gender_Type x Age_Range)
+is fetched once and scattered into a dense array indexed by dimension codes.
+Every coarser group-by is then a sum over some axes of that array, computed
+once when the cube is built, so a chart's rollup is a dict lookup plus
+turning the (small) array into a frame, and slicing to one governorate never
+touches the underlying rows.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+
+# Dataset -> the dimensions its cube is built over. Every Aggregation on the
+# dataset whose group-by is a subset of these is answered from the cube.
+CUBE_DIMENSIONS = {
+    'economy': ['Economy_Type', 'Gender_Type', 'Status'],
+    'emp_age': ['Governorate', 'Gender_Type', 'Age_Range'],
+    'main_jobs': ['Occupation_Type', 'Gender_Type', 'Age_Range'],
+    'nature_work': ['Governorate', 'Gender_Type', 'Employment_Type_Name'],
+    'pop_age': ['Governorate', 'Gender_Type', 'Age_Range'],
+    'education': ['Governorate', 'Gender_Type', 'Status'],
+    'insurance': ['Governorate', 'Gender_Type', 'Insurance_Type'],
+    'main_job_sectors': ['Occupation_Type', 'Gender_Type', 'Sector'],
+    'sector_age': ['Sector_Name', 'Gender_Type', 'Age_Range'],
+}
+
+
+def covers(agg):
+    """True if `agg` can be answered from its dataset's cube."""
+    dimensions = CUBE_DIMENSIONS.get(agg.dataset)
+    return dimensions is not None and set(agg.group_by) <= set(dimensions)
+
+
+class Cube:
+    """Sums (and contributing row counts) for every subset of `dimensions`."""
+
+    def __init__(self, dimensions, labels, values, counts, value="Total"):
+        self.dimensions = tuple(dimensions)
+        self.labels = {dim: pd.Index(labels[dim], name=dim) for dim in self.dimensions}
+        self.value = value
+        self._rollups = {}
+        axes = range(len(self.dimensions))
+        for size in range(len(self.dimensions) + 1):
+            for keep in combinations(axes, size):
+                summed = tuple(axis for axis in axes if axis not in keep)
+                key = tuple(self.dimensions[axis] for axis in keep)
+                self._rollups[key] = (values.sum(axis=summed), counts.sum(axis=summed))
+
+    @classmethod
+    def from_frame(cls, df, dimensions, value="Total"):
+        """Build a cube in one pass over df; rows with a missing label are left out."""
+        codes, labels = [], {}
+        for dim in dimensions:
+            dim_codes, uniques = pd.factorize(df[dim], sort=True)
+            codes.append(dim_codes)
+            labels[dim] = np.asarray(uniques, dtype=object)
+        shape = tuple(len(labels[dim]) for dim in dimensions)
+        present = np.logical_and.reduce([c >= 0 for c in codes])
+        measure = pd.to_numeric(df[value], errors="coerce").fillna(0).to_numpy()[present]
+
+        cell = np.ravel_multi_index([c[present] for c in codes], shape)
+        size = int(np.prod(shape))
+        values = np.bincount(cell, weights=measure, minlength=size).reshape(shape)
+        if np.issubdtype(measure.dtype, np.integer):
+            values = values.round().astype(np.int64)
+        counts = np.bincount(cell, minlength=size).reshape(shape)
+        return cls(dimensions, labels, values, counts, value)
+
+    def _lookup(self, group_by):
+        key = tuple(dim for dim in self.dimensions if dim in group_by)
+        if len(key) != len(group_by) or set(key) != set(group_by):
+            raise KeyError(f"cube over {self.dimensions} cannot group by {tuple(group_by)}")
+        values, counts = self._rollups[key]
+        order = [key.index(dim) for dim in group_by]
+        return values.transpose(order), counts.transpose(order)
+
+    def rollup(self, group_by=()):
+        """SUM(value) by `group_by`, shaped like Aggregation results (empty groups dropped)."""
+        group_by = list(group_by)
+        values, counts = self._lookup(group_by)
+        if not group_by:
+            return pd.DataFrame({self.value: [values.item()]})
+        index = pd.MultiIndex.from_product([self.labels[dim] for dim in group_by])
+        frame = pd.DataFrame({self.value: values.ravel()}, index=index)
+        return frame[counts.ravel() > 0].reset_index()
+
+    def total(self, **selection):
+        """SUM(value) for one cell of the rollup over the selected dimensions."""
+        values, _ = self._lookup(list(selection))
+        position = tuple(self.labels[dim].get_loc(label) for dim, label in selection.items())
+        return values[position].item()
+
+    def slice(self, **selection):
+        """Sub-cube for the selected labels. A single label drops that dimension; a list keeps it."""
+        values, counts = self._rollups[self.dimensions]
+        index, dimensions, labels = [], [], {}
+        for dim in self.dimensions:
+            if dim not in selection:
+                index.append(slice(None))
+                dimensions.append(dim)
+                labels[dim] = self.labels[dim]
+            elif isinstance(selection[dim], (list, tuple, set)):
+                keep = self.labels[dim].get_indexer(list(selection[dim]))
+                if (keep < 0).any():
+                    raise KeyError(f"unknown {dim}: {selection[dim]}")
+                index.append(keep)
+                dimensions.append(dim)
+                labels[dim] = self.labels[dim][keep]
+            else:
+                index.append(self.labels[dim].get_loc(selection[dim]))
+        # One axis at a time, last first, so dropping an axis doesn't shift the ones still to index
+        for axis, selector in reversed(list(enumerate(index))):
+            if not isinstance(selector, slice):
+                values = np.take(values, selector, axis=axis)
+                counts = np.take(counts, selector, axis=axis)
+        return Cube(dimensions, labels, values, counts, self.value)
@@ -0,0 +1,80 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import profiling
+
+
+def fetch_tables(conn, source, names=None):
+    names = names or list(source.tables)
+    return {name: source.read_sql(f"SELECT * FROM {source.tables[name]}", conn) for name in names}
+
+
+def count_rows(conn, source, names=None):
+    """Row count per dataset in a single round trip."""
+    names = names or list(source.tables)
+    query = " UNION ALL ".join(
+        f"SELECT '{name}' AS dataset, COUNT(*) AS n FROM {source.tables[name]}" for name in names
+    )
+    with profiling.span("query", "count rows"):
+        counts = source.read_sql(query, conn)
+    return dict(zip(counts["dataset"], counts["n"].astype(int)))
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections; each connection is used by one thread at a time."""
+
+    def __init__(self, factory, size=4):
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.size = size
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._factory()
+            try:
+                yield conn
+            except Exception:
+                # The connection may be mid-transaction or broken; don't hand it out again
+                conn.close()
+                raise
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def load_tables(pool, source, names=None, max_workers=None):
+    """Fetch tables from `source` concurrently over a pool of its connections.
+
+    Returns ({dataset: DataFrame}, {dataset: seconds}) with datasets in request order.
+    """
+    names = names or list(source.tables)
+
+    def fetch(name):
+        with pool.connection() as conn:
+            start = time.perf_counter()
+            with profiling.span("query", f"load {name}"):
+                df = source.read_sql(f"SELECT * FROM {source.tables[name]}", conn)
+            return df, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max_workers or pool.size, thread_name_prefix="load") as executor:
+        results = dict(zip(names, executor.map(profiling.bind(fetch), names)))
+
+    frames = {name: results[name][0] for name in names}
+    timings = {name: results[name][1] for name in names}
+    return frames, timings
@@ -0,0 +1,351 @@
+"""Databases the dashboard datasets can be read from.
+
+A DataSource knows how to open a connection, which table backs each dataset,
+and how to run a query into a DataFrame. The dashboard reads from SQL Server by
+default; set DASHBOARD_BACKEND=embedded to serve it from a local DuckDB (or,
+without duckdb installed, SQLite) file built from the `Cleaned Data/` workbooks,
+with no network or ODBC driver involved.
+"""
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from cleaned_data import CLEANED_DATA_DIR, read_flat_tables, workbook_files
+from star_schema import build_star_schema
+
+
+CONNECTION_STRING = (
+    "Driver={ODBC Driver 17 for SQL Server};"
+    "Server=localhost\\SQLEXPRESS;"
+    "Database=Employment_in_Egypt;"
+    "Trusted_Connection=yes;"
+)
+
+# Dataset name -> source table in Employment_in_Egypt
+DATASET_TABLES = {
+    'economy': '[dbo].[Economy_And_LifeOfWork]',
+    'economy_age': '[EconomyAndAge_Fact]',
+    'emp_age': '[dbo].[Emp&Age]',
+    'main_jobs': '[dbo].[MainjobsSecAndAge]',
+    'nature_work': '[dbo].[NatureOfWork]',
+    'pop_age': '[dbo].[PopAndAge]',
+    'education': '[dbo].[Educational_Status]',
+    'insurance': '[dbo].[Social_Insurance]',
+    'main_job_sectors': '[dbo].[MainJobAndSectors]',
+    'sector_age': '[dbo].[Sector&Age]',
+}
+
+# Tables only the Analysis Queries read; not dashboard datasets, so the
+# Overview counts and the Dataset Explorer leave them out
+ANALYSIS_TABLES = {
+    'economy_age_flat': '[dbo].[EconomyAndAge]',
+}
+
+SOURCE_TABLES = {**DATASET_TABLES, **ANALYSIS_TABLES}
+
+# Same tables in the embedded database, which has no dbo schema
+EMBEDDED_TABLES = {
+    name: '"' + table.split('.')[-1].strip('[]') + '"' for name, table in SOURCE_TABLES.items()
+}
+
+EMBEDDED_DIR = os.environ.get(
+    "EMBEDDED_DB_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedded")
+)
+BACKEND = os.environ.get("DASHBOARD_BACKEND", "sqlserver")
+
+
+class DataSource:
+    name = None
+    label = None
+    tables = SOURCE_TABLES
+
+    def connect(self):
+        raise NotImplementedError
+
+    def read_sql(self, query, conn):
+        return pd.read_sql(query, conn)
+
+    def execute(self, conn, statement):
+        conn.execute(statement)
+
+    def execute_count(self, conn, statement):
+        """Run a DML statement and return the number of rows it touched."""
+        return conn.execute(statement).rowcount
+
+    def begin(self, conn):
+        """Start a transaction spanning every statement up to conn.commit().
+
+        pyodbc connections are not autocommit, so one is always open there.
+        """
+
+    def stage_frame(self, conn, name, df):
+        """Load df into a temporary table visible to this connection only; returns how to name it."""
+        raise NotImplementedError
+
+    def merge(self, conn, target, staging, keys, value):
+        """Apply the staged rows to `target`: delete where `value` is missing, else update or insert.
+
+        Three set-based statements, for engines without MERGE. `staging` holds
+        at most one row per key. Returns (inserted, updated, deleted) row counts.
+        """
+        columns = ", ".join(f'"{column}"' for column in [*keys, value])
+        values = ", ".join(f's."{column}"' for column in [*keys, value])
+        match = " AND ".join(f'{target}."{key}" = s."{key}"' for key in keys)
+        deleted = self.execute_count(
+            conn, f'DELETE FROM {target} WHERE EXISTS (SELECT 1 FROM {staging} AS s WHERE {match} AND s."{value}" IS NULL)'
+        )
+        updated = self.execute_count(
+            conn,
+            f'UPDATE {target} SET "{value}" = (SELECT s."{value}" FROM {staging} AS s WHERE {match}) '
+            f'WHERE EXISTS (SELECT 1 FROM {staging} AS s WHERE {match} AND s."{value}" IS NOT NULL)',
+        )
+        inserted = self.execute_count(
+            conn,
+            f'INSERT INTO {target} ({columns}) SELECT {values} FROM {staging} AS s '
+            f'WHERE s."{value}" IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {target} WHERE {match})',
+        )
+        return inserted, updated, deleted
+
+    def table_ref(self, table):
+        """How queries name a table written with write_frame."""
+        return f'"{table}"'
+
+    def close(self):
+        pass
+
+
+class SqlServerSource(DataSource):
+    name = "sqlserver"
+    label = "SQL Server"
+
+    def __init__(self, connection_string=CONNECTION_STRING):
+        self.connection_string = connection_string
+
+    def connect(self):
+        # Imported here so the dashboard can run on the embedded backend without the ODBC driver installed
+        import pyodbc
+
+        return pyodbc.connect(self.connection_string)
+
+    def table_ref(self, table):
+        return f"[dbo].[{_sql_server_name(table)}]"
+
+    def write_frame(self, conn, table, df, append=False, chunk_size=10_000):
+        """Replace (or append df to) [dbo].[table], sending each chunk of rows as one parameter array."""
+        self._write(conn, self.table_ref(table), df, create=not append, chunk_size=chunk_size)
+
+    def stage_frame(self, conn, name, df):
+        staging = f"[#{_sql_server_name(name)}]"
+        self._write(conn, staging, df, create=True)
+        return staging
+
+    def merge(self, conn, target, staging, keys, value):
+        match = " AND ".join(f"t.[{key}] = s.[{key}]" for key in keys)
+        columns = ", ".join(f"[{column}]" for column in [*keys, value])
+        values = ", ".join(f"s.[{column}]" for column in [*keys, value])
+        # HOLDLOCK: without it MERGE can race a concurrent insert of the same key
+        statement = (
+            f"MERGE {target} WITH (HOLDLOCK) AS t USING {staging} AS s ON {match} "
+            f"WHEN MATCHED AND s.[{value}] IS NULL THEN DELETE "
+            f"WHEN MATCHED THEN UPDATE SET t.[{value}] = s.[{value}] "
+            f"WHEN NOT MATCHED BY TARGET AND s.[{value}] IS NOT NULL THEN INSERT ({columns}) VALUES ({values}) "
+            f"OUTPUT $action;"
+        )
+        cursor = conn.cursor()
+        try:
+            actions = [action for action, in cursor.execute(statement).fetchall()]
+        finally:
+            cursor.close()
+        return actions.count("INSERT"), actions.count("UPDATE"), actions.count("DELETE")
+
+    def _write(self, conn, name, df, create, chunk_size=10_000):
+        columns = ", ".join(f"[{_sql_server_name(column)}]" for column in df.columns)
+        definitions = ", ".join(
+            f"[{_sql_server_name(column)}] {_sql_server_type(values)}" for column, values in df.items()
+        )
+        insert = f"INSERT INTO {name} ({columns}) VALUES ({', '.join('?' * len(df.columns))})"
+
+        cursor = conn.cursor()
+        try:
+            if create:
+                cursor.execute(f"DROP TABLE IF EXISTS {name}")
+                cursor.execute(f"CREATE TABLE {name} ({definitions})")
+            # Without this pyodbc makes a round trip per row, which is what made df.to_sql so slow
+            cursor.fast_executemany = True
+            for start in range(0, len(df), chunk_size):
+                chunk = df.iloc[start:start + chunk_size].astype(object)
+                cursor.executemany(insert, list(chunk.where(chunk.notna(), None).itertuples(index=False, name=None)))
+        finally:
+            cursor.close()
+
+
+def _sql_server_name(name):
+    return str(name).replace("]", "]]")
+
+
+def _sql_server_type(values):
+    if pd.api.types.is_bool_dtype(values):
+        return "BIT"
+    if pd.api.types.is_integer_dtype(values):
+        return "BIGINT"
+    if pd.api.types.is_float_dtype(values):
+        return "FLOAT"
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return "DATETIME2"
+    # Bounded NVARCHAR keeps fast_executemany's parameter arrays small; MAX forces row-by-row streaming.
+    # At least 255 wide, as streamed workbooks create the table from their first batch only
+    lengths = values.dropna().astype(str).str.len()
+    width = max(255, int(lengths.max())) if len(lengths) else 255
+    return f"NVARCHAR({width})" if width <= 4000 else "NVARCHAR(MAX)"
+
+
+class SQLiteSource(DataSource):
+    name = "sqlite"
+    label = "SQLite"
+
+    def __init__(self, path, tables=EMBEDDED_TABLES):
+        self.path = path
+        self.tables = tables
+
+    def connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def write_frame(self, conn, table, df, append=False):
+        df.to_sql(table, conn, index=False, if_exists="append" if append else "replace")
+
+    def begin(self, conn):
+        # sqlite3 only opens one implicitly before DML, so the staging table would be outside it
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+
+    def stage_frame(self, conn, name, df):
+        # Not df.to_sql: pandas commits after writing, which would end the caller's transaction
+        staging = f'temp."{name}"'
+        columns = ", ".join(f'"{column}"' for column in df.columns)
+        conn.execute(f"DROP TABLE IF EXISTS {staging}")
+        conn.execute(f"CREATE TABLE {staging} ({columns})")
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        conn.executemany(f"INSERT INTO {staging} VALUES ({', '.join('?' * len(df.columns))})", rows)
+        return staging
+
+
+class DuckDBSource(DataSource):
+    """DuckDB file shared by one in-process database; each connect() is a cursor on it."""
+
+    name = "duckdb"
+    label = "DuckDB"
+
+    def __init__(self, path, tables=EMBEDDED_TABLES, read_only=False):
+        self.path = path
+        self.tables = tables
+        self.read_only = read_only
+        self._db = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        import duckdb
+
+        with self._lock:
+            if self._db is None:
+                self._db = duckdb.connect(self.path, read_only=self.read_only)
+            return self._db.cursor()
+
+    def read_sql(self, query, conn):
+        return conn.execute(query).df()
+
+    def execute_count(self, conn, statement):
+        # DuckDB returns the count as the statement's result
+        return conn.execute(statement).fetchone()[0]
+
+    def begin(self, conn):
+        conn.execute("BEGIN TRANSACTION")
+
+    def stage_frame(self, conn, name, df):
+        conn.register("_frame", df)
+        try:
+            conn.execute(f'CREATE OR REPLACE TEMP TABLE "{name}" AS SELECT * FROM _frame')
+        finally:
+            conn.unregister("_frame")
+        return f'"{name}"'
+
+    def write_frame(self, conn, table, df, append=False):
+        conn.register("_frame", df)
+        try:
+            if append:
+                conn.execute(f'INSERT INTO "{table}" SELECT * FROM _frame')
+            else:
+                conn.execute(f'CREATE OR REPLACE TABLE "{table}" AS SELECT * FROM _frame')
+        finally:
+            conn.unregister("_frame")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+EMBEDDED_ENGINES = {"duckdb": DuckDBSource, "sqlite": SQLiteSource}
+
+
+def default_engine():
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return "sqlite"
+    return "duckdb"
+
+
+def embedded_path(engine, folder=EMBEDDED_DIR):
+    return os.path.join(folder, f"Employment_in_Egypt.{engine}")
+
+
+def build_embedded(path, engine, workbooks=CLEANED_DATA_DIR):
+    """Load the workbooks into a new embedded database at `path`, with the star schema built from them."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staging = path + ".tmp"
+    if os.path.exists(staging):
+        os.remove(staging)
+
+    source = EMBEDDED_ENGINES[engine](staging)
+    conn = source.connect()
+    try:
+        flat = read_flat_tables(workbooks)
+        star, _ = build_star_schema(flat)
+        for table, df in {**flat, **star}.items():
+            source.write_frame(conn, table, df)
+        conn.commit()
+    finally:
+        conn.close()
+        source.close()
+    # Readers never see a half-built file
+    os.replace(staging, path)
+
+
+def is_stale(path, workbooks=CLEANED_DATA_DIR):
+    if not os.path.exists(path):
+        return True
+    built = os.path.getmtime(path)
+    return any(os.path.getmtime(workbook) > built for workbook in workbook_files(workbooks))
+
+
+def embedded_source(engine=None, path=None, workbooks=CLEANED_DATA_DIR, rebuild=False):
+    """Return an embedded source, (re)building its file if the workbooks changed since it was built."""
+    engine = engine or default_engine()
+    path = path or embedded_path(engine)
+    if rebuild or is_stale(path, workbooks):
+        build_embedded(path, engine, workbooks)
+    return EMBEDDED_ENGINES[engine](path)
+
+
+def get_source(backend=BACKEND):
+    """`sqlserver`, `embedded` (DuckDB when installed, else SQLite), `duckdb` or `sqlite`."""
+    if backend == "sqlserver":
+        return SqlServerSource()
+    if backend == "embedded":
+        return embedded_source()
+    if backend in EMBEDDED_ENGINES:
+        return embedded_source(backend)
+    raise ValueError(f"unknown DASHBOARD_BACKEND {backend!r}")
@@ -0,0 +1,81 @@
+from collections.abc import Mapping
+
+from analysis_queries import QUERIES
+from data_sources import DATASET_TABLES, SOURCE_TABLES
+
+
+# Tables the Analysis Queries run on, in first-use order
+QUERY_DATASETS = list(dict.fromkeys(dataset for query in QUERIES.values() for dataset in query.datasets))
+
+# Raw datasets each sidebar section reads. Most charts are built from
+# aggregations pushed down to the database (see aggregations.py); full rows
+# are needed by the Economy bar chart, the employment-rate cube of Employment
+# & Age (joined PopAndAge and EmpAndAge) and the Summary Report's Analysis
+# Queries. The Overview metrics only need row counts, and its explorer loads
+# whichever dataset is picked.
+SECTION_DATASETS = {
+    "🏠 Overview": [],
+    "💼 Economy Analysis": ['economy'],
+    "👥 Employment & Age": ['pop_age', 'emp_age'],
+    "🎓 Education Analysis": [],
+    "🗺️ Geographical Analysis": [],
+    "🏥 Social Insurance": [],
+    "📊 Summary Report": QUERY_DATASETS,
+}
+
+
+class LazyDatasets(Mapping):
+    """Dict of dataset name -> DataFrame that fetches each table on first access.
+
+    `loader(name)` returns one DataFrame (the app passes a cached function, so a
+    table is queried at most once per cache lifetime). `counter()` returns
+    {name: rows} for all datasets without loading them. Membership and iteration
+    only look at the dataset names, so `'economy' in data` and `data.keys()`
+    never trigger a query. They cover the dashboard datasets; the tables only
+    the Analysis Queries read can still be fetched by name.
+    """
+
+    def __init__(self, loader, counter=None, on_error=None):
+        self._loader = loader
+        self._counter = counter
+        self._on_error = on_error
+        self._frames = {}
+        self._counts = None
+
+    def __getitem__(self, name):
+        if name not in SOURCE_TABLES:
+            raise KeyError(name)
+        if name not in self._frames:
+            try:
+                self._frames[name] = self._loader(name)
+            except Exception as e:
+                if self._on_error is None:
+                    raise
+                self._on_error(name, e)
+                raise
+        return self._frames[name]
+
+    def __contains__(self, name):
+        return name in DATASET_TABLES
+
+    def __iter__(self):
+        return iter(DATASET_TABLES)
+
+    def __len__(self):
+        return len(DATASET_TABLES)
+
+    def require(self, names):
+        for name in names:
+            self[name]
+
+    def loaded(self):
+        return list(self._frames)
+
+    def row_count(self, name):
+        if name in self._frames:
+            return len(self._frames[name])
+        if self._counts is None:
+            self._counts = self._counter() if self._counter else {}
+        if name not in self._counts:
+            return len(self[name])
+        return self._counts[name]
@@ -0,0 +1,54 @@
+"""Derived columns the dashboard charts read, added once per loaded frame.
+
+The app caches the enriched frames and shares them between sessions, so
+sections must treat them as read-only: build new frames (`assign`, `pivot`,
+`groupby`, ...) instead of assigning columns into them.
+"""
+import pandas as pd
+
+
+# Education status -> the coarser level the Education charts are drawn by
+EDUCATION_LEVELS = {
+    'Illiterate': 'Basic Literacy',
+    'Literate (can read and write without formal qualification)': 'Basic Literacy',
+    'Literacy certificate (post-illiteracy program)': 'Basic Literacy',
+    'Primary school': 'Primary',
+    'Preparatory school (Middle school)': 'Preparatory',
+    'General Secondary / Azhar Secondary': 'Secondary',
+    'Intermediate Technical Qualification': 'Technical',
+    'Above Intermediate Qualification (Diploma)': 'Diploma',
+    'University Degree (Bachelor\'s)': 'University',
+    'Higher Diploma': 'Postgraduate',
+    'Master\'s Degree': 'Postgraduate',
+    'Doctorate (PhD)': 'Postgraduate',
+    'Intellectual Education (special education)': 'Special Education',
+}
+
+SHORT_LABEL_WIDTH = 25
+
+
+def _per_label(values, transform):
+    # Transform each distinct label once and broadcast by lookup; on a
+    # category column this only touches the categories
+    labels = pd.Series(pd.unique(values.dropna()), dtype=object)
+    return values.map(dict(zip(labels, transform(labels))))
+
+
+def short_labels(values, width=SHORT_LABEL_WIDTH):
+    return _per_label(values, lambda labels: labels.where(labels.str.len() <= width, labels.str[:width - 2] + "..."))
+
+
+def enrich(df, dataset):
+    """Return df with numeric Total and the derived columns its dataset supports."""
+    columns = {}
+    if "Total" in df and not pd.api.types.is_numeric_dtype(df["Total"]):
+        columns["Total"] = pd.to_numeric(df["Total"], errors="coerce")
+    if "Economy_Type" in df:
+        columns["Economy_Short"] = short_labels(df["Economy_Type"])
+    if dataset == "education" and "Status" in df:
+        columns["Education_Level"] = df["Status"].map(EDUCATION_LEVELS)
+
+    enriched = df.assign(**columns) if columns else df
+    if "Total" in columns:
+        enriched = enriched[enriched["Total"].notna()]
+    return enriched
@@ -0,0 +1,210 @@
+"""Render every dashboard chart and the Summary Report to files, without Streamlit.
+
+    python export_report.py exports/                        # from the current snapshot
+    python export_report.py exports/ --backend duckdb --format svg --jobs 8
+
+Data comes from the on-disk snapshot (snapshot.py) the app serves from, or,
+with --backend, straight from an embedded database (see data_sources.py).
+Section results are computed once in this process with analytics.py; the
+charts are then drawn in a process pool, since matplotlib draws on one
+thread and holds the GIL while it does. Each worker receives only the
+section result its chart is drawn from.
+
+Matplotlib charts are written as PNG or SVG, Plotly charts and the governorate
+maps as standalone HTML, the Summary Report as summary.html and the Analysis
+Queries (analysis_queries.py) as CSV, with an index.html linking them all. The wall time of every chart is printed and
+saved to timings.csv.
+"""
+import argparse
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import charts
+import snapshot
+from analysis_queries import QUERIES
+from analytics import MAP_DATASETS, Analytics
+from data_loader import fetch_tables
+from data_sources import EMBEDDED_ENGINES, embedded_source
+from enrich import enrich
+from normalize import compact_frames
+
+
+# One file to write: `chart` is the charts.py chart id drawn, `name` the file it goes to
+Export = namedtuple("Export", ["name", "chart", "args"])
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body style="background-color: #0e1117; color: #fafafa; font-family: 'Inter', 'Segoe UI', sans-serif;">
+{body}
+</body></html>
+"""
+
+
+def load_frames(backend=None):
+    """{dataset: enriched DataFrame} from an embedded database, or from the current snapshot when backend is None."""
+    if backend is None:
+        frames = snapshot.read_snapshot()
+        if frames is None:
+            raise SystemExit("no data snapshot found; open the dashboard once or pass --backend")
+    else:
+        source = embedded_source(None if backend == "embedded" else backend)
+        conn = source.connect()
+        try:
+            frames, _ = compact_frames(fetch_tables(conn, source))
+        finally:
+            conn.close()
+    return {name: enrich(df, name) for name, df in frames.items()}
+
+
+def exports(engine, frames):
+    """Every chart the dashboard draws, with the section result (or rows) it is drawn from."""
+    economy = engine.economy()
+    yield from (Export(chart, chart, (economy,)) for chart in charts.SECTION_CHARTS["economy"])
+    if "economy" in frames:
+        yield Export("economy/type_gender_bar", "economy/type_gender_bar", (frames["economy"], economy.type_totals.index))
+
+    employment = engine.employment()
+    for chart in charts.SECTION_CHARTS["employment"]:
+        # The section leaves out what its dataset can't show
+        if chart == "employment/nature_of_work" and employment.nature_tiles is None:
+            continue
+        if chart == "employment/jobs_heatmap" and employment.jobs_by_age is None:
+            continue
+        yield Export(chart, chart, (employment,))
+
+    education = engine.education()
+    yield from (Export(chart, chart, (education,)) for chart in charts.SECTION_CHARTS["education"])
+
+    for map_type, dataset in MAP_DATASETS.items():
+        color, heatmap = charts.MAP_STYLES[map_type]
+        yield Export(f"geography/{dataset}", "geography/map", (engine.geography(dataset), color, heatmap))
+
+    insurance = engine.insurance()
+    rollups = {
+        "insurance/coverage": insurance.coverage,
+        "insurance/jobs": insurance.jobs,
+        "insurance/sectors": insurance.sector_hierarchy,
+    }
+    yield from (Export(chart, chart, (insurance,)) for chart, rollup in rollups.items() if rollup is not None)
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    charts.plt.style.use(charts.STYLE)
+
+
+def _draw(chart):
+    for group in charts.SECTION_CHARTS.values():
+        if chart in group:
+            return group[chart]
+    return charts.CHARTS[chart]
+
+
+def render(export, directory, fmt):
+    """Draw one export and write it under `directory`; returns (export name, path, seconds)."""
+    from figures import render as render_figure
+
+    start = time.perf_counter()
+    fig = _draw(export.chart)(*export.args)
+    base = os.path.join(directory, *export.name.split("/"))
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    if hasattr(fig, "savefig"):  # matplotlib
+        path = f"{base}.{fmt}"
+        with open(path, "wb") as f:
+            f.write(render_figure(fig, fmt))
+    elif hasattr(fig, "write_html"):  # Plotly
+        path = f"{base}.html"
+        fig.write_html(path, include_plotlyjs="cdn")
+    else:  # folium
+        path = f"{base}.html"
+        fig.save(path)
+    return export.name, path, time.perf_counter() - start
+
+
+def write_index(directory, paths, title="Egypt Employment Analysis"):
+    links = []
+    for section in dict.fromkeys(path.split(os.sep)[0] for path in paths):
+        links.append(f"<h2 style=\"color: #D4AF37;\">{section}</h2>")
+        for path in (p for p in paths if p.split(os.sep)[0] == section):
+            url = path.replace(os.sep, "/")
+            if url.endswith((".html", ".csv")):
+                links.append(f'<p><a style="color: #8B5CF6;" href="{url}">{url}</a></p>')
+            else:
+                links.append(f'<p><img src="{url}" style="max-width: 900px;"></p>')
+    with open(os.path.join(directory, "index.html"), "w", encoding="utf-8") as f:
+        f.write(PAGE.format(title=title, body="\n".join(links)))
+
+
+def export_report(directory, frames, fmt="png", jobs=None):
+    """Write every chart and the Summary Report under `directory`.
+
+    Returns (DataFrame of chart, path, seconds per file written, {chart: error} for charts that failed).
+    """
+    os.makedirs(directory, exist_ok=True)
+    engine = Analytics.over_frames(frames)
+
+    start = time.perf_counter()
+    summary = charts.summary_report(engine.totals(), len(frames.get("economy", ())))
+    with open(os.path.join(directory, "summary.html"), "w", encoding="utf-8") as f:
+        f.write(PAGE.format(title="Analysis Summary", body=summary))
+    rows = [("summary", os.path.join(directory, "summary.html"), time.perf_counter() - start)]
+
+    for name in QUERIES:
+        start = time.perf_counter()
+        result = engine.query(name)
+        if result is not None:
+            path = os.path.join(directory, "queries", f"{name}.csv")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            result.to_csv(path, index=False)
+            rows.append((f"queries/{name}", path, time.perf_counter() - start))
+
+    failed = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        futures = {pool.submit(render, export, directory, fmt): export.name for export in exports(engine, frames)}
+        for future in as_completed(futures):
+            try:
+                name, path, seconds = future.result()
+            except Exception as e:
+                # One chart failing (say, its plotting library isn't installed) doesn't stop the rest
+                failed[futures[future]] = f"{type(e).__name__}: {e}"
+                print(f"  failed  {futures[future]}: {failed[futures[future]]}", flush=True)
+                continue
+            print(f"{seconds:8.3f}s  {os.path.relpath(path, directory)}", flush=True)
+            rows.append((name, path, seconds))
+
+    timings = pd.DataFrame(rows, columns=["chart", "path", "seconds"]).sort_values("chart", ignore_index=True)
+    timings.to_csv(os.path.join(directory, "timings.csv"), index=False)
+    write_index(directory, [os.path.relpath(path, directory) for path in timings["path"]])
+    return timings, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="where to write the files")
+    parser.add_argument("--backend", choices=["embedded", *EMBEDDED_ENGINES],
+                        help="read an embedded database instead of the current snapshot")
+    parser.add_argument("--format", choices=["png", "svg"], default="png", help="for the matplotlib charts")
+    parser.add_argument("--jobs", type=int, default=None, help="render processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frames = load_frames(args.backend)
+    loaded = time.perf_counter() - start
+    timings, failed = export_report(args.directory, frames, args.format, args.jobs)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(timings)} files in {elapsed:.2f}s (data {loaded:.2f}s, "
+        f"{timings['seconds'].sum():.2f}s of rendering) -> {os.path.join(args.directory, 'index.html')}"
+    )
+    if failed:
+        raise SystemExit(f"{len(failed)} charts failed: {', '.join(sorted(failed))}")
+
+
+if __name__ == "__main__":
+    main()
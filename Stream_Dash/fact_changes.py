@@ -0,0 +1,75 @@
+"""Batch changes to the fact tables.
+
+`Techmical Codes/Stored_procedure.sql` changes a fact table one row per
+procedure call, so applying a revised survey release through it costs a round
+trip per row. apply_changes takes the changes as DataFrames instead: each
+fact's rows are deduplicated on its composite key (the dimension ids), loaded
+into a temporary staging table with the source's bulk insert, and applied with
+one set-based MERGE (on the embedded engines, one DELETE, UPDATE and INSERT),
+all in a single transaction.
+
+A change row carries the fact's id columns and Total. A missing Total deletes
+the row with that key; otherwise the row is updated, or inserted if the key is
+new. When a key appears more than once, the last row wins.
+
+    apply_changes(source, {"EconomyAndAge_Fact": revised})
+
+The dashboard sees the changes once its snapshot is refreshed.
+"""
+from collections import namedtuple
+
+from star_schema import DIMENSIONS, FACTS
+
+
+VALUE = "Total"
+
+MergeResult = namedtuple("MergeResult", ["fact", "rows", "duplicates", "inserted", "updated", "deleted"])
+
+
+def fact_keys(fact):
+    """Id columns making up the composite key of a fact table."""
+    return [DIMENSIONS[dim].id for dim, _ in FACTS[fact].keys]
+
+
+def prepare(fact, changes):
+    """(staged rows, duplicates dropped): changes reduced to one row per key of `fact`."""
+    if fact not in FACTS:
+        raise ValueError(f"unknown fact table {fact!r}")
+    keys = fact_keys(fact)
+    missing = [column for column in [*keys, VALUE] if column not in changes.columns]
+    if missing:
+        raise ValueError(f"{fact} changes lack columns {missing}")
+    if changes[keys].isna().any(axis=None):
+        raise ValueError(f"{fact} changes have rows with a missing key")
+
+    staged = changes[[*keys, VALUE]].drop_duplicates(keys, keep="last")
+    staged = staged.astype({**{key: "int64" for key in keys}, VALUE: "Int64"}).reset_index(drop=True)
+    return staged, len(changes) - len(staged)
+
+
+def apply_changes(source, changes, conn=None):
+    """Apply {fact table: DataFrame of changes} in one transaction; returns a MergeResult per fact.
+
+    Nothing is applied if any fact fails. Uses `conn` if given (the caller
+    keeps ownership of it), else a connection of its own.
+    """
+    prepared = {fact: prepare(fact, frame) for fact, frame in changes.items()}
+    own = conn is None
+    if own:
+        conn = source.connect()
+    try:
+        source.begin(conn)
+        results = []
+        for fact, (staged, duplicates) in prepared.items():
+            staging = source.stage_frame(conn, f"{fact}_changes", staged)
+            inserted, updated, deleted = source.merge(conn, source.table_ref(fact), staging, fact_keys(fact), VALUE)
+            source.execute(conn, f"DROP TABLE {staging}")
+            results.append(MergeResult(fact, len(staged), duplicates, inserted, updated, deleted))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        if own:
+            conn.close()
+    return results
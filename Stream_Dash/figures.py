@@ -0,0 +1,122 @@
+"""Cache of rendered matplotlib charts.
+
+Streamlit reruns the whole script on every interaction, and drawing the
+matplotlib/seaborn figures is the largest CPU cost of a rerun. FigureCache
+keeps the rendered image bytes keyed by (chart id, data version, parameters),
+so repeat views of a section are served from memory. Entries are evicted least
+recently used first once the cache holds more than `max_bytes`.
+
+Figures are closed as soon as they are rendered; pyplot keeps every open
+figure alive otherwise, and memory grows with each rerun.
+
+Pyplot is process-wide state: one registry of figures, one "current" figure
+that plt.tight_layout() acts on, one set of rcParams. Charts are drawn by the
+script thread of every session and by the prefetch pool, so get_or_render
+draws and renders one chart at a time under RENDER_LOCK, in the cache's style
+applied for that render only (never plt.style.use, which would restyle every
+other chart). Background renders pass wait=False: they skip a chart rather
+than queue for the lock, so they never add to a rerun's wait.
+"""
+import contextlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import profiling
+from lazy_imports import LazyModule
+
+
+plt = LazyModule("matplotlib.pyplot")
+
+
+MAX_BYTES = int(os.environ.get("FIGURE_CACHE_BYTES", 64 * 2**20))
+
+# Same output as st.pyplot
+SAVEFIG_OPTIONS = {"dpi": 200, "bbox_inches": "tight"}
+
+# Held while a figure is drawn and rendered through pyplot
+RENDER_LOCK = threading.RLock()
+
+
+def render(fig, fmt="png"):
+    """Return fig as PNG/SVG bytes and close it."""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, **SAVEFIG_OPTIONS)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """Thread-safe LRU of rendered charts with a total byte budget; `style` is the matplotlib style charts are drawn in."""
+
+    def __init__(self, max_bytes=MAX_BYTES, style=None):
+        self.max_bytes = max_bytes
+        self.style = style
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(chart, version, fmt="png", **params):
+        return chart, version, fmt, tuple(sorted(params.items()))
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._images:
+                self._bytes -= len(self._images.pop(key))
+            if len(image) > self.max_bytes:
+                return  # would evict everything else and still not fit
+            self._images[key] = image
+            self._bytes += len(image)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def get_or_render(self, chart, version, draw, fmt="png", wait=True, **params):
+        """Cached image for the chart, calling draw() -> Figure to render it on a miss.
+
+        With wait=False a miss is only rendered if no other render is under way;
+        otherwise nothing is rendered and None is returned.
+        """
+        key = self.key(chart, version, fmt, **params)
+        image = self.get(key)
+        if image is not None:
+            return image
+        if not RENDER_LOCK.acquire(blocking=wait):
+            return None
+        try:
+            # Another thread may have rendered it while this one waited
+            with self._lock:
+                image = self._images.get(key)
+            if image is None:
+                style = plt.style.context(self.style) if self.style else contextlib.nullcontext()
+                with profiling.span("render", chart), style:
+                    image = render(draw(), fmt)
+                self.put(key, image)
+        finally:
+            RENDER_LOCK.release()
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"charts": len(self._images), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,133 @@
+"""Governorate index for the Geographical section, built once per process.
+
+One row per governorate, keyed by a canonical key (the upper-cased English
+name): the name the tables use, the Arabic name, the map position and Gov_id
+as the Governorates dimension numbers it (ids in label order, see
+star_schema.build_dimensions). Every spelling a governorate is known under,
+Arabic included, is an alias of its key.
+
+locate() joins a frame with the index without per-row lookups: the label
+column is factorized, each distinct label is resolved to a row of the index
+once, and the rows take their coordinates by position.
+
+Boundaries for the choropleth map are read from an optional GeoJSON file
+(GOVERNORATE_GEOJSON); each feature is matched to a governorate through the
+same aliases, whichever name property the file carries.
+"""
+import json
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+Governorate = namedtuple("Governorate", ["name", "arabic", "lat", "lon", "aliases"])
+
+GOVERNORATES = [
+    Governorate('Alexandria', 'الإسكندرية', 31.2001, 29.9187, ['Alex', 'Al Iskandariyah']),
+    Governorate('Asiut', 'أسيوط', 27.1809, 31.1837, ['Assiut', 'Asyut', 'Assyout']),
+    Governorate('Aswan', 'أسوان', 24.0889, 32.8998, ['Assuan']),
+    Governorate('Bani Suef', 'بني سويف', 29.0667, 31.0833, ['Beni Suef', 'Beni Sueif', 'Bani Sweif', 'Bani Suwayf']),
+    Governorate('Beheira', 'البحيرة', 31.0424, 30.4712, ['Behera', 'Buhayrah', 'Al Buhayrah', 'El Beheira']),
+    Governorate('Cairo', 'القاهرة', 30.0444, 31.2357, ['Al Qahirah']),
+    Governorate('Dakahlia', 'الدقهلية', 31.0409, 31.3785, ['Dakahlya', 'Daqahliya', 'Ad Daqahliyah']),
+    Governorate('Damietta', 'دمياط', 31.4165, 31.8133, ['Dumyat']),
+    Governorate('Faiyum', 'الفيوم', 29.3084, 30.8428, ['Fayoum', 'Fayum', 'Al Fayyum', 'El Fayoum']),
+    Governorate('Gharbia', 'الغربية', 30.7865, 30.9955, ['Gharbiya', 'Al Gharbiyah']),
+    Governorate('Giza', 'الجيزة', 30.0131, 31.2089, ['Gizah', 'Al Jizah']),
+    Governorate('Ismailia', 'الإسماعيلية', 30.5965, 32.2715, ['Ismailiya', 'Al Ismailiyah']),
+    Governorate('Kafr El Sheikh', 'كفر الشيخ', 31.1117, 30.9394, ['Kafr Ash Shaykh', 'Kafr El Shaikh']),
+    Governorate('Luxor', 'الأقصر', 25.6872, 32.6396, ['Al Uqsur']),
+    Governorate('Matrouh', 'مطروح', 31.3525, 27.2373, ['Matruh', 'Marsa Matruh']),
+    Governorate('Menoufia', 'المنوفية', 30.4659, 30.9309, ['Menofia', 'Monufia', 'Al Minufiyah']),
+    Governorate('Minya', 'المنيا', 28.0871, 30.7618, ['Al Minya', 'El Minya']),
+    Governorate('New Valley', 'الوادي الجديد', 25.4439, 28.9229, ['Al Wadi Al Jadid', 'Wadi El Gedid']),
+    Governorate('North Sinai', 'شمال سيناء', 31.1300, 33.8000, ['Shamal Sina', 'North Sinaa']),
+    Governorate('Port Said', 'بورسعيد', 31.2653, 32.3019, ['Bur Said', 'Port Saeed']),
+    Governorate('Qalyubia', 'القليوبية', 30.4167, 31.2167, ['Qalyubiya', 'Kalyoubia', 'Al Qalyubiyah']),
+    Governorate('Qena', 'قنا', 26.1642, 32.7267, ['Qina', 'Kena']),
+    Governorate('Red Sea', 'البحر الأحمر', 26.5560, 33.9667, ['Al Bahr Al Ahmar']),
+    Governorate('Sharkia', 'الشرقية', 30.5877, 31.5021, ['Sharqia', 'Sharqiya', 'Ash Sharqiyah', 'Al Sharqia']),
+    Governorate('Sohag', 'سوهاج', 26.5560, 31.6948, ['Suhag', 'Sawhaj']),
+    Governorate('South Sinai', 'جنوب سيناء', 28.5390, 33.9750, ['Janub Sina', 'South Sinaa']),
+    Governorate('Suez', 'السويس', 29.9668, 32.5498, ['As Suways']),
+]
+
+GOVERNORATE_GEOJSON = os.environ.get(
+    "GOVERNORATE_GEOJSON",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "egypt_governorates.geojson"),
+)
+
+# Feature properties tried, in order, for a boundary's governorate name
+NAME_PROPERTIES = ["Gov_Name", "name", "name_en", "NAME_1", "ADM1_EN", "shapeName", "name_ar", "ADM1_AR"]
+
+_ARABIC_VARIANTS = str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ة': 'ه', 'ى': 'ي'})
+
+
+def normalize(labels):
+    """Series of labels -> the form aliases are matched in: upper case, single spaces, one spelling of alef."""
+    labels = pd.Series(labels, dtype=object).astype(str)
+    labels = labels.str.translate(_ARABIC_VARIANTS).str.upper()
+    return labels.str.replace(r"[\s\-_']+", " ", regex=True).str.strip()
+
+
+def _build_index(governorates):
+    index = pd.DataFrame(
+        [(g.name, g.arabic, g.lat, g.lon) for g in governorates],
+        columns=["Gov_Name", "Gov_Name_Ar", "lat", "lon"],
+    ).sort_values("Gov_Name", ignore_index=True)
+    index.insert(0, "Gov_id", np.arange(1, len(index) + 1, dtype="int32"))
+    index.index = pd.Index(index["Gov_Name"].str.upper(), name="Gov_key")
+
+    keys, labels = zip(*[(g.name.upper(), label) for g in governorates for label in [g.name, g.arabic, *g.aliases]])
+    labels = normalize(labels)
+    # "Al Minya" also as "Minya", "El Beheira" as "Beheira"; exact spellings take precedence
+    aliases = dict(zip(labels.str.replace(r"^(AL|EL|AS|ASH|AD) ", "", regex=True), keys))
+    aliases.update(zip(labels, keys))
+    return index, aliases
+
+
+INDEX, ALIASES = _build_index(GOVERNORATES)
+
+
+def resolve(labels):
+    """Canonical key for each label (NaN where it names no known governorate)."""
+    return normalize(labels).map(ALIASES).to_numpy(dtype=object)
+
+
+def locate(df, column='Governorate'):
+    """df rows naming a known governorate, with Gov_key, Gov_id, lat and lon joined from the index."""
+    codes, labels = pd.factorize(df[column])
+    # Row of the index for each distinct label, -1 when it isn't a governorate;
+    # the trailing -1 is what missing labels (code -1) pick
+    positions = np.append(INDEX.index.get_indexer(resolve(labels)), -1)
+    rows = positions[codes]
+    found = rows >= 0
+    matched = INDEX.iloc[rows[found]]
+    return df[found].assign(
+        Gov_key=matched.index.to_numpy(),
+        Gov_id=matched["Gov_id"].to_numpy(),
+        lat=matched["lat"].to_numpy(),
+        lon=matched["lon"].to_numpy(),
+    )
+
+
+@lru_cache(maxsize=4)
+def boundaries(path=GOVERNORATE_GEOJSON):
+    """Governorate boundary features keyed by Gov_key, or None when there is no boundaries file.
+
+    Features whose name matches no governorate are left out.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    names = [
+        next((feature["properties"][p] for p in NAME_PROPERTIES if feature["properties"].get(p)), "")
+        for feature in features
+    ]
+    return {
+        key: feature for key, feature in zip(resolve(names), features) if isinstance(key, str)
+    }
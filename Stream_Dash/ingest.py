@@ -0,0 +1,397 @@
+"""Bulk-load the Excel workbooks into a dashboard database, incrementally.
+
+Replaces the loop in `Techmical Codes/EXCEL_To_SQL.ipynb`, which read every
+workbook in turn and wrote it with `df.to_sql`, one INSERT per row through
+pyodbc. Here the workbooks are parsed in a process pool (openpyxl parsing is
+CPU-bound and holds the GIL) while the main process bulk-loads each parsed
+table as soon as it is ready: fast_executemany parameter arrays on SQL Server,
+a single CREATE TABLE AS on DuckDB, executemany on SQLite.
+
+Runs are incremental. Each workbook is content-hashed, and a manifest per
+target database records the hash every table was last loaded from, so
+unchanged workbooks are skipped. Parsed tables are cached as Parquet keyed by
+workbook hash and by a hash of the parsing code (cleaned_data.py, labels.py,
+workbook_reader.py); a table whose workbook is back to a hash seen before is
+loaded from the cache without parsing, unless the parser changed since.
+
+Workbooks of INGEST_STREAM_BYTES or more (such as `Actual File.xlsx`) are not
+parsed whole; workbook_reader streams their rows into the table in batches,
+so memory stays bounded by one batch.
+
+    python ingest.py                                    # raw workbooks -> SQL Server, like the notebook
+    python ingest.py --flat --backend duckdb --workers 4
+    python ingest.py --backend sqlite --path /tmp/bench.sqlite --full
+
+`--flat` loads the dashboard's flat tables (see cleaned_data.py) instead of one
+table per workbook, then rebuilds the dimension and fact tables that depend on
+a reloaded flat table (see star_schema.py) and reports fact rows whose labels
+matched no dimension. Until that rebuild commits, the manifest keeps the
+reloaded tables as pending, so a run that fails or is interrupted before it
+rebuilds them on the next run even if no workbook changed.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+import pandas as pd
+
+import cleaned_data
+import labels
+import workbook_reader
+from cleaned_data import CLEANED_DATA_DIR, FLAT_TABLES, flat_table_workbook, read_flat_table, workbook_files
+from data_sources import EMBEDDED_ENGINES, SqlServerSource, default_engine, embedded_path
+from star_schema import DIMENSIONS, FACTS, affected_by, build_dimensions, build_facts, relabeled
+from workbook_reader import BATCH_ROWS, SchemaChanged, iter_batches, read_sheet
+
+
+CACHE_DIR = os.environ.get(
+    "INGEST_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingest_cache")
+)
+MANIFEST_FORMAT = 1
+
+# Modules whose code decides what a parsed table holds
+PARSER_MODULES = (cleaned_data, labels, workbook_reader)
+
+# Workbooks at least this big are streamed into the database batch by batch
+# instead of being parsed whole in a worker process
+STREAM_BYTES = int(os.environ.get("INGEST_STREAM_BYTES", 1 * 2**20))
+
+# One table: where it came from, its rows, how it was obtained ("parsed",
+# "streamed", "cached" or "unchanged"), and the seconds spent parsing and writing it
+IngestResult = namedtuple("IngestResult", ["table", "origin", "rows", "status", "parse_seconds", "load_seconds"])
+
+
+def table_name(path):
+    # Same naming as the notebook: "Sales Data - Q1 2025.xlsx" -> "Sales_Data___Q1_2025"
+    return os.path.splitext(os.path.basename(path))[0].replace(' ', '_').replace('-', '_')
+
+
+def file_hash(path, chunk_size=2**20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse(table, path, flat, folder):
+    start = time.perf_counter()
+    # Raw CAPMAS sheets often have title rows above the header
+    df = read_flat_table(table, folder) if flat else read_sheet(path, header="auto")
+    return df, time.perf_counter() - start
+
+
+def _tables(folder, flat):
+    """{table: workbook path} for every table a run loads."""
+    if flat:
+        return {table: flat_table_workbook(table, folder) for table in FLAT_TABLES}
+    return {table_name(path): path for path in workbook_files(folder)}
+
+
+def _target(source):
+    # Embedded databases are told apart by file; SQL Server by connection string
+    return os.path.abspath(source.path) if hasattr(source, "path") else source.connection_string
+
+
+def _manifest_path(source, flat, cache_dir):
+    key = hashlib.sha1(f"{_target(source)}|{'flat' if flat else 'workbooks'}".encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"manifest-{source.name}-{key}.json")
+
+
+def read_manifest(path):
+    """(tables, pending): {table: what it was last loaded from}, and the flat tables whose star schema isn't rebuilt."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}, set()
+    if manifest.get("format") != MANIFEST_FORMAT:
+        return {}, set()
+    return manifest["tables"], set(manifest.get("pending_rebuild", []))
+
+
+def _write_manifest(path, tables, pending=()):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(
+            {"format": MANIFEST_FORMAT, "tables": tables, "pending_rebuild": sorted(pending)},
+            f, indent=2, ensure_ascii=False,
+        )
+    os.replace(path + ".tmp", path)
+
+
+@lru_cache(maxsize=1)
+def parser_version():
+    """Hash of the parsing code, so a change to it (say, a new label translation) invalidates the parsed cache."""
+    digest = hashlib.sha256()
+    for module in PARSER_MODULES:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir, table, digest):
+    return os.path.join(cache_dir, "parsed", f"{table}-{digest[:16]}-{parser_version()[:8]}.parquet")
+
+
+def _write_cache(path, df):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        df.to_parquet(path + ".tmp", index=False)
+    except (ValueError, TypeError, ImportError) as e:
+        # Parquet can't store every object column pandas can; parse next time
+        print(f"  not caching {os.path.basename(path)}: {e}")
+        return
+    os.replace(path + ".tmp", path)
+
+
+def _storable(df):
+    """df with each object column not purely text (mixed numbers and text, as pd.read_excel leaves one, or
+    no values at all in this batch) as strings, so a database column made from it is a text column."""
+    mixed = {}
+    for column, values in df.items():
+        present = values.dropna()
+        if values.dtype == object and (present.empty or not present.map(type).eq(str).all()):
+            mixed[column] = values.astype("string")
+    return df.assign(**mixed) if mixed else df
+
+
+def _stream(source, conn, table, path, cache_path, batch_size=BATCH_ROWS):
+    """Load a workbook into `table` one batch of rows at a time. Returns (rows, parse seconds, load seconds).
+
+    A batch whose columns don't fit the earlier ones (a number column that
+    turns out to hold text further down) starts the table over, reading
+    the sheet again with the columns as the whole pass so far has seen them.
+    """
+    schema, parse_seconds, load_seconds = None, 0.0, 0.0
+    while True:
+        try:
+            rows, parsed, loaded = _stream_pass(source, conn, table, path, cache_path, batch_size, schema)
+        except SchemaChanged as e:
+            schema = e.schema
+            parse_seconds += e.parse_seconds
+            load_seconds += e.load_seconds
+            continue
+        return rows, parse_seconds + parsed, load_seconds + loaded
+
+
+def _stream_pass(source, conn, table, path, cache_path, batch_size, schema):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows, parse_seconds, load_seconds = 0, 0.0, 0.0
+    writer = None
+    batches = iter_batches(path, header="auto", batch_size=batch_size, strict=True, schema=schema)
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                batch = next(batches, None)
+            except SchemaChanged as e:
+                e.parse_seconds = parse_seconds + time.perf_counter() - start
+                e.load_seconds = load_seconds
+                raise
+            parse_seconds += time.perf_counter() - start
+            if batch is None:
+                break
+            batch = _storable(batch)
+
+            start = time.perf_counter()
+            source.write_frame(conn, table, batch, append=rows > 0)
+            load_seconds += time.perf_counter() - start
+            rows += len(batch)
+
+            if writer is not False:
+                try:
+                    arrow = pa.Table.from_pandas(batch, preserve_index=False)
+                    if writer is None:
+                        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                        writer = pq.ParquetWriter(cache_path + ".tmp", arrow.schema)
+                    writer.write_table(arrow.cast(writer.schema))
+                except (ValueError, TypeError, pa.ArrowException):
+                    # Parquet can't store this batch (say, a mixed column); load on, but don't cache this workbook
+                    if writer is not None:
+                        writer.close()
+                        os.remove(cache_path + ".tmp")
+                    writer = False
+        start = time.perf_counter()
+        conn.commit()
+        load_seconds += time.perf_counter() - start
+    finally:
+        if writer:
+            writer.close()
+    if writer:
+        os.replace(cache_path + ".tmp", cache_path)
+    return rows, parse_seconds, load_seconds
+
+
+def _read_dimension(source, conn, table):
+    try:
+        return source.read_sql(f"SELECT * FROM {source.table_ref(table)}", conn)
+    except Exception:
+        return None  # not built yet
+
+
+def _rebuild_star_schema(source, conn, changed, frames):
+    """Rebuild the dimension and fact tables depending on the `changed` flat tables. Returns the unmatched labels.
+
+    Dimensions keep the ids already in the database, so besides the facts of
+    the changed tables, only facts keyed on a dimension whose labels changed
+    are rebuilt, and only those dimensions are written.
+    """
+    def read(table):
+        return frames[table] if table in frames else source.read_sql(f"SELECT * FROM {source.table_ref(table)}", conn)
+
+    dims, _ = affected_by(changed)
+    flat = {table: read(table) for table in {table for dim in dims for table, _ in DIMENSIONS[dim].sources}}
+    current = {dim: df for dim, df in ((dim, _read_dimension(source, conn, dim)) for dim in dims) if df is not None}
+    dimensions = build_dimensions(flat, dims, existing=current)
+    changed_dims = relabeled(current, dimensions)
+    _, facts = affected_by(changed, changed_dims)
+    # Flat tables of the rebuilt facts, and the dimensions kept as they are that those facts are keyed on
+    needed = {FACTS[fact].flat for fact in facts}
+    needed |= {dim for fact in facts for dim, _ in FACTS[fact].keys if dim not in dims}
+    flat.update({table: read(table) for table in needed if table not in flat})
+    lookup = {**{dim: flat[dim] for dim in needed if dim in DIMENSIONS}, **dimensions}
+    fact_tables, unmatched = build_facts(flat, lookup, facts)
+    # Facts go first: on SQL Server they may still hold foreign keys to the dimensions being replaced
+    for fact in facts:
+        source.execute(conn, f"DROP TABLE IF EXISTS {source.table_ref(fact)}")
+    for table in changed_dims:
+        source.write_frame(conn, table, dimensions[table])
+    for table, df in fact_tables.items():
+        source.write_frame(conn, table, df)
+    conn.commit()
+    return unmatched
+
+
+def ingest(source, folder=CLEANED_DATA_DIR, flat=False, workers=None, full=False, cache_dir=CACHE_DIR):
+    """Load the workbooks in `folder` that changed since the last run into `source`.
+
+    `full` reloads every table. Returns (results, unmatched): an IngestResult
+    per table, unchanged tables first and then the others in the order they
+    finished loading, and in --flat mode the labels per fact table that
+    matched no dimension.
+    """
+    manifest_path = _manifest_path(source, flat, cache_dir)
+    # A new database file has none of the tables the manifest remembers
+    new_target = hasattr(source, "path") and not os.path.exists(source.path)
+    loaded, rebuild = ({}, set()) if full or new_target else read_manifest(manifest_path)
+    # Flat tables loaded by an earlier run whose star-schema rebuild never committed
+    rebuild = rebuild if flat else set()
+
+    results, pending, frames = [], {}, {}
+    for table, path in _tables(folder, flat).items():
+        digest = file_hash(path)
+        entry = loaded.get(table)
+        if entry and entry["sha256"] == digest:
+            results.append(IngestResult(table, entry["workbook"], entry["rows"], "unchanged", 0.0, 0.0))
+        else:
+            pending[table] = (path, digest)
+    if not pending and not rebuild:
+        return results, {}
+
+    conn = source.connect()
+    try:
+        def load(table, df, status, parse_seconds):
+            path, digest = pending[table]
+            start = time.perf_counter()
+            source.write_frame(conn, table, df)
+            conn.commit()
+            if flat:
+                frames[table] = df
+                rebuild.add(table)
+            results.append(IngestResult(
+                table, os.path.basename(path), len(df), status, parse_seconds, time.perf_counter() - start
+            ))
+            # Saved after every table, so an interrupted run resumes where it stopped
+            loaded[table] = {"workbook": os.path.basename(path), "sha256": digest, "rows": len(df)}
+            _write_manifest(manifest_path, loaded, rebuild)
+
+        to_parse = []
+        for table, (path, digest) in pending.items():
+            cached = _cache_path(cache_dir, table, digest)
+            if os.path.exists(cached):
+                start = time.perf_counter()
+                df = pd.read_parquet(cached)
+                load(table, df, "cached", time.perf_counter() - start)
+            elif not flat and os.path.getsize(path) >= STREAM_BYTES:
+                rows, parse_seconds, load_seconds = _stream(source, conn, table, path, cached)
+                results.append(IngestResult(table, os.path.basename(path), rows, "streamed", parse_seconds, load_seconds))
+                loaded[table] = {"workbook": os.path.basename(path), "sha256": digest, "rows": rows}
+                _write_manifest(manifest_path, loaded, rebuild)
+            else:
+                to_parse.append(table)
+
+        if to_parse:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_parse, table, pending[table][0], flat, folder): table for table in to_parse
+                }
+                for future in as_completed(futures):
+                    table = futures[future]
+                    df, parse_seconds = future.result()
+                    df = _storable(df)
+                    _write_cache(_cache_path(cache_dir, table, pending[table][1]), df)
+                    load(table, df, "parsed", parse_seconds)
+
+        unmatched = {}
+        if flat:
+            unmatched = _rebuild_star_schema(source, conn, rebuild, frames)
+            _write_manifest(manifest_path, loaded)
+    finally:
+        conn.close()
+        source.close()
+    return results, unmatched
+
+
+def report(results):
+    """Per-table rows/sec as a DataFrame, slowest load first."""
+    frame = pd.DataFrame(results, columns=IngestResult._fields)
+    frame["rows_per_sec"] = frame["rows"] / frame["load_seconds"].where(frame["load_seconds"] > 0)
+    return frame.sort_values("load_seconds", ascending=False, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--folder", default=CLEANED_DATA_DIR, help="folder of .xlsx workbooks")
+    parser.add_argument("--backend", choices=["sqlserver", "embedded", *EMBEDDED_ENGINES], default="sqlserver")
+    parser.add_argument("--path", help="database file for an embedded backend")
+    parser.add_argument("--flat", action="store_true", help="load the dashboard's flat tables, not one table per workbook")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: one per CPU)")
+    parser.add_argument("--full", action="store_true", help="reload every table, changed or not")
+    args = parser.parse_args()
+
+    if args.backend == "sqlserver":
+        source = SqlServerSource()
+    else:
+        engine = default_engine() if args.backend == "embedded" else args.backend
+        path = args.path or embedded_path(engine)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        source = EMBEDDED_ENGINES[engine](path)
+
+    start = time.perf_counter()
+    results, unmatched = ingest(source, args.folder, flat=args.flat, workers=args.workers, full=args.full)
+    elapsed = time.perf_counter() - start
+
+    changed = [result for result in results if result.status != "unchanged"]
+    rows = sum(result.rows for result in changed)
+    print(
+        f"{len(changed)} of {len(results)} tables reloaded, {rows:,} rows into {source.label} "
+        f"in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)"
+    )
+    if changed:
+        with pd.option_context("display.width", 160, "display.max_colwidth", 60):
+            print(report(changed).round(3).to_string(index=False))
+    for fact, columns in unmatched.items():
+        for column, missing in columns.items():
+            print(f"  {fact}: {column} labels with no dimension row, left out: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
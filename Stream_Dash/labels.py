@@ -0,0 +1,191 @@
+"""English labels for the Arabic categories in the CAPMAS workbooks.
+
+The workbooks spell the same category several ways (hamza forms, alef maqsura,
+tatweel padding such as 'حكومـــــــــى', stray spaces), so lookups go through
+normalize_label() on both sides.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+
+_ARABIC_FOLD = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ى": "ي", "ة": "ه", "ـ": None})
+
+
+def normalize_label(text):
+    text = str(text).translate(_ARABIC_FOLD)
+    text = re.sub(r"\s*/\s*", "/", text)
+    return " ".join(text.split()).lower()
+
+
+def _lookup(mapping):
+    return {normalize_label(key): value for key, value in mapping.items()}
+
+
+def translate(values, mapping):
+    """Map a Series of raw labels to English; labels with no entry are kept (trimmed).
+
+    Only the distinct values are normalized, so this is cheap on long columns.
+    """
+    lookup = _lookup(mapping)
+    codes, uniques = pd.factorize(values)
+    # Trailing None is what missing values (code -1) pick up
+    translated = np.array(
+        [lookup.get(normalize_label(u), " ".join(str(u).split())) for u in uniques] + [None], dtype=object
+    )
+    return pd.Series(translated[codes], index=values.index)
+
+
+def untranslated(values, mapping):
+    """Distinct labels in `values` that have no English entry."""
+    lookup = _lookup(mapping)
+    return sorted({str(u) for u in pd.unique(values.dropna()) if normalize_label(u) not in lookup})
+
+
+GENDERS = {
+    "ذكر": "Male",
+    "ذكور": "Male",
+    "انثى": "Female",
+    "انثي": "Female",
+    "إناث": "Female",
+}
+
+# ISO 3166-2 code -> (English name, Arabic name). English names match the
+# governorate keys used by the dashboard map.
+GOVERNORATES = {
+    "EG-C": ("Cairo", "القاهرة"),
+    "EG-ALX": ("Alexandria", "الإسكندرية"),
+    "EG-PTS": ("Port Said", "بورسعيد"),
+    "EG-SUZ": ("Suez", "السويس"),
+    "EG-DT": ("Damietta", "دمياط"),
+    "EG-DK": ("Dakahlia", "الدقهلية"),
+    "EG-SHR": ("Sharkia", "الشرقية"),
+    "EG-KB": ("Qalyubia", "القليوبية"),
+    "EG-KFS": ("Kafr El Sheikh", "كفر الشيخ"),
+    "EG-GH": ("Gharbia", "الغربية"),
+    "EG-MNF": ("Menoufia", "المنوفية"),
+    "EG-BH": ("Beheira", "البحيرة"),
+    "EG-IS": ("Ismailia", "الإسماعيلية"),
+    "EG-GZ": ("Giza", "الجيزة"),
+    "EG-BNS": ("Bani Suef", "بنى سويف"),
+    "EG-FYM": ("Faiyum", "الفيوم"),
+    "EG-MN": ("Minya", "المنيا"),
+    "EG-AST": ("Asiut", "أسيوط"),
+    "EG-SHG": ("Sohag", "سوهاج"),
+    "EG-KN": ("Qena", "قنا"),
+    "EG-ASN": ("Aswan", "أسوان"),
+    "EG-LX": ("Luxor", "الأقصر"),
+    "EG-BA": ("Red Sea", "البحر الأحمر"),
+    "EG-WAD": ("New Valley", "الوادى الجديد"),
+    "EG-MT": ("Matrouh", "مطروح"),
+    "EG-SIN": ("North Sinai", "شمال سيناء"),
+    "EG-JS": ("South Sinai", "جنوب سيناء"),
+}
+GOVERNORATE_NAMES = {arabic: english for english, arabic in GOVERNORATES.values()}
+
+EDUCATION_STATUS = {
+    "أمى": "Illiterate",
+    "يقرأ ويكتب بدون مؤهل": "Literate (can read and write without formal qualification)",
+    "محو أمية": "Literacy certificate (post-illiteracy program)",
+    "تربية فكرية": "Intellectual Education (special education)",
+    "ابتدائية": "Primary school",
+    "اعدادية": "Preparatory school (Middle school)",
+    "ثانوية عامة / أزهرى": "General Secondary / Azhar Secondary",
+    "مؤهل متوسط فنى": "Intermediate Technical Qualification",
+    "مؤهل فوق متوسط": "Above Intermediate Qualification (Diploma)",
+    "مؤهل جامعى": "University Degree (Bachelor's)",
+    "دبلوم عالى": "Higher Diploma",
+    "ماجستير": "Master's Degree",
+    "دكتوراه": "Doctorate (PhD)",
+}
+
+ECONOMY_TYPES = {
+    "الزراعة واستغلال الغابات وقطع الاشجار وصيد الاسماك": "Agriculture, forestry and fishing",
+    "التعدين واستغلال المحاجر": "Mining and quarrying",
+    "الصناعات التحويلية": "Manufacturing",
+    "إمدادات الكهرباء والغاز والبخار وإمدادات تكييف الهواء": "Electricity, gas, steam and air conditioning supply",
+    "إمدادات الكهرباء والغاز والبخار وإمدادات تكيف الهواء": "Electricity, gas, steam and air conditioning supply",
+    "الإمداد المائى وشبكات الصرف الصحى وادارة ومعالجة النفايات": "Water supply, sewerage and waste management",
+    "التشييد والبناء": "Construction",
+    "تجارة الجملة والتجزئة والإصلاح للمركبات ذات المحركات والدراجات النارية": "Wholesale and retail trade; repair of vehicles",
+    "تجارة الجملة والتجزئة والإصلاح للمركبات ذات المحركات والدرجات النارية": "Wholesale and retail trade; repair of vehicles",
+    "النقل والتخزين": "Transportation and storage",
+    "خدمات الغذاء والإقامة": "Accommodation and food services",
+    "المعلومات والاتصالات": "Information and communication",
+    "الوساطة المالية والتأمين": "Financial and insurance activities",
+    "العقارات والتأجير": "Real estate activities",
+    "الانشطة العلمية والتقنية المتخصصة": "Professional, scientific and technical activities",
+    "الانشطة الإدارية وخدمات الدعم": "Administrative and support services",
+    "الإدارة العامة والدفاع والضمان الاجتماعى الاجبارى": "Public administration and defence",
+    "التعليم": "Education",
+    "الصحة وأنشطة العمل الاجتماعى": "Human health and social work",
+    "أنشطة الفنون والابداع والتسلية": "Arts, entertainment and recreation",
+    "أنشطة الخدمات الاخرى": "Other service activities",
+    "أنشطة الخدمات الخرى": "Other service activities",
+    "خدمات أفراد الخدمة المنزلية الخاصة للأسر": "Activities of households as employers",
+    "خدمات أفراد الخدمة المنزلية الخاصة بالأسرة": "Activities of households as employers",
+    "المنظمات والهيئات الدولية والاقليمية والسفارات والقنصليات الاجنبية": "Extraterritorial organizations and bodies",
+    "أنشطة غير كاملة التوصيف": "Activities not adequately defined",
+}
+
+WORK_STATUS = {
+    "صاحب عمل ويستخدم آخرين": "Employer",
+    "يعمل لحسابه بمفرده": "Self-employed",
+    "يعمل بأجر": "Wage worker",
+    "يعمل بدون أجر لدي الأسرة": "Unpaid family worker",
+    "يعمل بدون أجر لدي الغير": "Unpaid worker for others",
+}
+
+NATURE_OF_WORK = {
+    "دائم": "Permanent",
+    "مؤقت": "Temporary",
+    "موسمى": "Seasonal",
+    "متقطع": "Intermittent",
+}
+
+INSURANCE_TYPES = {
+    "مشترك": "Subscriber",
+    "مستفيد": "Beneficiary",
+    "مشترك ومستفيد": "Subscriber and beneficiary",
+    "غير مشترك وغير مستفيد": "Not covered",
+}
+
+OCCUPATIONS = {
+    "المديرين": "Managers",
+    "الأخصائيون(أصحاب المهن العلمية)": "Professionals",
+    "الفنيون ومساعدو الإخصائيين": "Technicians and associate professionals",
+    "الكتبة": "Clerical support workers",
+    "العاملون في مجال الخدمات والمبيعات": "Service and sales workers",
+    "العمال المهرة فى الزراعة والغابات والصيد": "Skilled agricultural and fishery workers",
+    "الحرفيون ومن إليهم": "Craft and related trades workers",
+    "عمال تشغيل المصانع والمركبات وعمال تجميع مكونات الإنتاج": "Plant and machine operators",
+    "العاملون فى المهن الأولية": "Elementary occupations",
+    "غير مبين": "Not stated",
+}
+
+SECTORS = {
+    "حكومى": "Government",
+    "عام/أعمال عام": "Public_Business",
+    "خاص/إستثمارى": "Private_Investment",
+    "خاص استثماري": "Private_Investment",
+    "خاص عادي": "Private_Regular",
+    "خاص عادي (داخل المنشآت)": "Private_Inside_Establishments",
+    "خاص عادي (عمل حر خارج المنزل)": "SelfEmployed_Outside_Home",
+    "خاص عادي (عمل حر داخل المنزل)": "SelfEmployed_Inside_Home",
+    "تعاونى": "Cooperative",
+    "جمعيات أهلية": "NGO",
+    "دبلوماسى": "Diplomatic",
+    "أخرى": "Other",
+}
+
+AREA_TYPES = {
+    "حضر": "Urban",
+    "ريف": "Rural",
+}
+
+# Column headers of the wide CAPMAS age tables -> age group labels used elsewhere
+AGE_BANDS = {
+    "15 -": "<15", "20 -": "<20", "25 -": "<25", "30 -": "<30", "35 -": "<35", "40 -": "<40",
+    "45 -": "<45", "50 -": "<50", "55 -": "<55", "60 -": "<60", "65 +": ">65",
+}
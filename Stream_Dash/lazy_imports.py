@@ -0,0 +1,56 @@
+"""Modules imported on first use instead of at startup.
+
+The plotting libraries take most of a cold start: seaborn, pywaffle, Plotly
+and folium each cost tens to hundreds of milliseconds to import, and each
+serves only one or two sections. A LazyModule stands in for one of them at
+module level and imports it the first time one of its attributes is read, so
+a worker only pays for the libraries of the sections it actually shows:
+
+    folium = LazyModule("folium")
+    folium.Map(...)   # imports folium here, on the first map drawn
+
+Python keeps imported modules in sys.modules, so after the first access each
+attribute read is one extra lookup. The import itself is timed as an "import"
+span (see profiling.py).
+"""
+import importlib
+import threading
+
+import profiling
+
+
+class LazyModule:
+    """Proxy for the module `name`, imported when an attribute is first read."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """The module, imported now if it hasn't been; raises ImportError when it isn't installed."""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    with profiling.span("import", self._name):
+                        self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def load_all(namespace):
+    """Import every LazyModule found in `namespace` (e.g. vars(charts)); returns {module: ImportError} for those not installed."""
+    missing = {}
+    for value in list(namespace.values()):
+        if isinstance(value, LazyModule):
+            try:
+                value.load()
+            except ImportError as e:
+                missing[value._name] = e
+    return missing
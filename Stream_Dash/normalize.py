@@ -0,0 +1,65 @@
+"""Load-time dtype normalization for the dashboard datasets.
+
+Tables come back from the database with every label as a Python object string
+and Total as int64/float64/object. The dimension columns have a handful of
+distinct values each (27 governorates, 2 genders, 12 age groups, ...), so
+storing them as `category` keeps one copy of each label plus small integer
+codes, and groupbys on them work on the codes instead of hashing strings.
+"""
+import pandas as pd
+
+
+# A text column is stored as a category when it has at most this many distinct
+# values per row; free-text columns are left alone
+MAX_CATEGORY_RATIO = 0.5
+
+
+def _is_text(values):
+    return pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)
+
+
+def _downcast(values):
+    if _is_text(values):
+        values = pd.to_numeric(values, errors="coerce")
+    if pd.api.types.is_float_dtype(values):
+        # Whole-number floats (SQL DECIMAL/FLOAT counts, or ints widened by a NULL-free read) become ints
+        if values.isna().any() or not (values % 1 == 0).all():
+            return values
+    return pd.to_numeric(values, downcast="integer")
+
+
+def compact(df, measures=("Total",)):
+    """Return df with low-cardinality text columns as categories and integer columns downcast."""
+    columns = {}
+    for name, values in df.items():
+        if name in measures:
+            values = _downcast(values)
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            pass
+        elif _is_text(values):
+            if values.nunique(dropna=True) <= max(1, len(values) * MAX_CATEGORY_RATIO):
+                values = values.astype("category")
+        elif pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, downcast="integer")  # fact table ids
+        columns[name] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def compact_frames(frames):
+    """Compact each frame. Returns ({dataset: DataFrame}, {dataset: {"before": bytes, "after": bytes}})."""
+    compacted, memory = {}, {}
+    for name, df in frames.items():
+        compacted[name] = compact(df)
+        memory[name] = {
+            "before": int(df.memory_usage(deep=True).sum()),
+            "after": int(compacted[name].memory_usage(deep=True).sum()),
+        }
+    return compacted, memory
+
+
+def memory_report(memory):
+    """Before/after memory per dataset as a DataFrame (MB), largest saving first."""
+    report = pd.DataFrame.from_dict(memory, orient="index") / 2**20
+    report.columns = ["Before (MB)", "After (MB)"]
+    report["Saved"] = (1 - report["After (MB)"] / report["Before (MB)"]).map("{:.0%}".format)
+    return report.sort_values("Before (MB)", ascending=False).round(3)
@@ -0,0 +1,235 @@
+"""Plotly versions of the matplotlib charts in charts.py, drawn in the browser.
+
+Same functions, arguments and chart ids as charts.py, so the app can switch
+rendering backend per chart id (see CHART_BACKEND in app.py). The server only
+builds and serializes the figure spec, which for these charts is one value per
+bar or slice; rasterization happens client side and the charts gain hover and
+zoom.
+
+The one chart drawn from full rows rather than a rollup (economy_type_gender)
+is aggregated here first, so its payload doesn't grow with the table.
+"""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from charts import ECONOMY_COLORS, EDUCATION_COLORS, FEMALE_COLOR, GENDER_COLORS, MALE_COLOR
+
+
+TEMPLATE = "plotly_dark"
+TITLE_COLOR = '#FFD700'
+
+
+def _style(fig, title, height=None, **layout):
+    fig.update_layout(
+        template=TEMPLATE,
+        title={"text": title, "font": {"color": TITLE_COLOR, "size": 18}},
+        height=height,
+        **layout,
+    )
+    return fig
+
+
+def _pie(values, title, colors, hole=0.0, legend_title=None):
+    fig = go.Figure(go.Pie(
+        labels=values.index, values=values.to_numpy(), hole=hole, sort=False,
+        marker={"colors": colors, "line": {"color": "white", "width": 1.2}},
+        textinfo="percent", texttemplate="%{percent:.1%}",
+        hovertemplate="%{label}<br>%{value:,.0f}<extra></extra>",
+    ))
+    return _style(fig, title, height=550, legend_title_text=legend_title)
+
+
+def _hbar(values, title, xlabel, ylabel, color, top_down=True, text=False):
+    fig = go.Figure(go.Bar(
+        x=values.to_numpy(), y=values.index, orientation="h",
+        marker={"color": color, "line": {"color": "white", "width": 0.7}},
+        text=[f"{v:,.0f}" for v in values.to_numpy()] if text else None, textposition="outside",
+        hovertemplate="%{y}<br>%{x:,.1f}<extra></extra>",
+    ))
+    fig = _style(fig, title, xaxis_title=xlabel, yaxis_title=ylabel)
+    if top_down:
+        # seaborn draws the first category at the top
+        fig.update_yaxes(autorange="reversed")
+    return fig
+
+
+# --- Economy ---
+
+def economy_types(economy):
+    return _pie(economy.type_slices, "Economy Type Distribution (Top 6 + Others)", ECONOMY_COLORS,
+                hole=0.4, legend_title="Economy Type")
+
+
+def economy_genders(economy):
+    fig = _pie(economy.gender_totals, "Overall Gender Distribution in Economy", GENDER_COLORS,
+               hole=0.35, legend_title="Gender")
+    fig.update_traces(textinfo="label+percent", texttemplate="%{label}<br>%{percent:.1%}")
+    fig.add_annotation(text=f"Total<br>{economy.gender_totals.sum():,}", showarrow=False,
+                       font={"size": 15, "color": '#D4AF37'})
+    return fig
+
+
+def economy_type_gender(rows, type_order):
+    # Mean and 95% interval per bar, as sns.barplot shows them, computed before sending
+    grouped = rows.groupby(["Economy_Short", "Gender_Type"], observed=True)["Total"]
+    stats = grouped.agg(["mean", "std", "count"]).reset_index()
+    stats["ci"] = 1.96 * stats["std"].fillna(0) / np.sqrt(stats["count"])
+    fig = px.bar(
+        stats, x="Economy_Short", y="mean", color="Gender_Type", error_y="ci", barmode="group",
+        category_orders={"Economy_Short": list(type_order)}, color_discrete_sequence=GENDER_COLORS,
+        labels={"Economy_Short": "Economy Type", "mean": "Total Count", "Gender_Type": "Gender"},
+    )
+    fig.update_xaxes(tickangle=45)
+    return _style(fig, "Total Count by Economy Type & Gender", height=600)
+
+
+def economy_top_male(economy):
+    return _hbar(economy.top_male, "Top 5 Economy Types (Male)", "Total Count", "Economy Type", MALE_COLOR, text=True)
+
+
+def economy_top_female(economy):
+    return _hbar(economy.top_female, "Top 5 Economy Types (Female)", "Total Count", "Economy Type", FEMALE_COLOR,
+                 text=True)
+
+
+def economy_gender_share(economy):
+    share = economy.gender_share
+    fig = go.Figure([
+        go.Bar(name=gender, x=share.index, y=share[gender].to_numpy(), marker={"color": color},
+               hovertemplate="%{x}<br>%{y:.1%}<extra>" + gender + "</extra>")
+        for gender, color in zip(share.columns, GENDER_COLORS)
+    ])
+    fig = _style(fig, "Gender Percentage by Economy Type", height=600, barmode="stack",
+                 xaxis_title="Economy Type", yaxis_title="Percentage", legend_title_text="Gender")
+    fig.update_yaxes(tickformat=".0%")
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+# --- Employment & Age ---
+
+def nature_of_work(employment, rows=5):
+    # Waffle: one square per tile, filled column by column like pywaffle
+    tiles = employment.nature_tiles
+    colors = ["#D4AF37", "#8B5CF6", "#10B981", "#EF4444"]
+    position = np.arange(int(tiles.sum()))
+    fig = go.Figure()
+    start = 0
+    for i, (label, count) in enumerate(tiles.items()):
+        cells = position[start:start + count]
+        start += count
+        fig.add_trace(go.Scatter(
+            x=cells // rows, y=cells % rows, mode="markers", name=label,
+            marker={"symbol": "square", "size": 22, "color": colors[i % len(colors)]},
+            hovertemplate=f"{label}: {count}%<extra></extra>",
+        ))
+    fig = _style(fig, "Nature of Work Distribution", height=350)
+    fig.update_xaxes(visible=False)
+    fig.update_yaxes(visible=False, scaleanchor="x")
+    return fig
+
+
+def jobs_heatmap(employment):
+    fig = px.imshow(employment.jobs_by_age, text_auto=".0f", color_continuous_scale="YlOrRd", aspect="auto",
+                    labels={"x": "Age Range", "y": "Occupation Type", "color": "Total"})
+    return _style(fig, "Job Distribution by Occupation Type and Age Range", height=650)
+
+
+def population_by_age(employment):
+    pivot = employment.population_by_age_gender
+    if pivot is not None:
+        fig = go.Figure([
+            go.Bar(name=gender, x=pivot.index, y=pivot[gender].to_numpy(), marker={"color": color})
+            for gender, color in zip(pivot.columns, ['#D4AF37', '#8B5CF6'])
+        ])
+        return _style(fig, "Population Distribution by Age Range and Gender", barmode="stack",
+                      xaxis_title="Age Range", yaxis_title="Total Population", legend_title_text="Gender")
+    by_age = employment.population_by_age
+    fig = go.Figure(go.Bar(x=by_age.index, y=by_age.to_numpy(), marker={"color": '#D4AF37'}, opacity=0.7))
+    return _style(fig, "Population Distribution by Age Range", xaxis_title="Age Range", yaxis_title="Total Population")
+
+
+# --- Education ---
+
+def education_levels(education):
+    levels = education.level_totals
+    return _pie(levels, "Education Level Distribution", EDUCATION_COLORS[:len(levels)], legend_title="Education Level")
+
+
+def education_levels_by_gender(education):
+    pivot = education.level_by_gender
+    fig = go.Figure([
+        go.Bar(name=gender, x=pivot.index, y=pivot[gender].to_numpy(), marker={"color": color})
+        for gender, color in zip(pivot.columns, ['#D4AF37', '#8B5CF6'])
+    ])
+    fig = _style(fig, "Education Level Distribution by Gender", height=600, barmode="group",
+                 xaxis_title="Education Level", yaxis_title="Total Count", legend_title_text="Gender")
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+def education_top_literacy(education):
+    return _hbar(education.top_literacy, "Top 10 Governorates by Literacy Rate (%)", "Literacy Rate (%)",
+                 "Governorate", '#10B981')
+
+
+def education_higher(education):
+    return _hbar(education.top_higher_education, "Top 10 Governorates - Higher Education Population",
+                 "University & Postgraduate Students", "Governorate", '#8B5CF6')
+
+
+def education_gender_ratio(education):
+    fig = _hbar(education.gender_gap['Gender_Ratio'], "Female-to-Male Ratio by Education Level (%)",
+                "Female/Male Ratio (%)", "Education Level", '#EC4899', top_down=False)
+    fig.add_vline(x=100, line_dash="dash", line_color='#FFD700', opacity=0.7,
+                  annotation_text="Gender Parity (100%)")
+    return fig
+
+
+def education_technical_academic(education):
+    values = education.top_technical_academic
+    fig = go.Figure(go.Bar(x=values.index, y=values.to_numpy(),
+                           marker={"color": '#F59E0B', "line": {"color": "white", "width": 0.7}}))
+    fig = _style(fig, "Technical & Academic Education by Governorate",
+                 xaxis_title="Governorate", yaxis_title="Total Students")
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+def education_pyramid(education):
+    pyramid = education.pyramid
+    fig = go.Figure(go.Bar(
+        x=pyramid.to_numpy(), y=pyramid.index, orientation="h",
+        marker={"color": EDUCATION_COLORS[:len(pyramid)], "line": {"color": "white", "width": 0.7}},
+    ))
+    return _style(fig, "Education Pyramid - Population by Level", height=700,
+                  xaxis_title="Total Population", yaxis_title="Education Level")
+
+
+def education_statuses(education):
+    statuses = education.top_statuses
+    colors = [EDUCATION_COLORS[i % len(EDUCATION_COLORS)] for i in range(len(statuses))]
+    return _hbar(statuses, "Top 15 Detailed Education Status Categories", "Total Count", "Education Status", colors)
+
+
+# Chart id -> draw(...) with the same arguments as charts.CHARTS
+CHARTS = {
+    "economy/type_donut": economy_types,
+    "economy/gender_donut": economy_genders,
+    "economy/type_gender_bar": economy_type_gender,
+    "economy/top_male": economy_top_male,
+    "economy/top_female": economy_top_female,
+    "economy/gender_share": economy_gender_share,
+    "employment/nature_of_work": nature_of_work,
+    "employment/jobs_heatmap": jobs_heatmap,
+    "employment/population_by_age": population_by_age,
+    "education/level_pie": education_levels,
+    "education/level_by_gender": education_levels_by_gender,
+    "education/top_literacy": education_top_literacy,
+    "education/higher_education": education_higher,
+    "education/gender_ratio": education_gender_ratio,
+    "education/technical_academic": education_technical_academic,
+    "education/pyramid": education_pyramid,
+    "education/status_detail": education_statuses,
+}
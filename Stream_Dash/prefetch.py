@@ -0,0 +1,143 @@
+"""Background warm-up of the sections a session is likely to open next.
+
+Most sessions go Overview -> Economy -> Education. Once a section has been
+drawn, the app hands the Prefetcher the steps that prepare the likely next
+sections (load their rows, compute their results, render their charts into
+the figure cache) and a small pool of worker threads runs them, so a section
+switch finds everything cached.
+
+Prefetching must never hold up a rerun the user is waiting on:
+
+- at most `max_workers` threads and `max_pending` queued sections, beyond
+  which new requests are dropped;
+- nothing is scheduled, and running work stops, while the load average per
+  CPU is above `max_load`;
+- a session's prefetch is cancelled as soon as it reruns: queued sections are
+  dropped and a running one stops before its next step, unless another
+  session asked for the same section and still wants it;
+- a section already warmed for the current data version isn't queued again;
+  one being warmed for another session is shared with this one.
+
+Steps are best effort; a step that fails ends that section's prefetch and the
+error surfaces when the section is actually opened.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+
+
+# Section -> the sections usually opened after it, most likely first
+NEXT_SECTIONS = {
+    "🏠 Overview": ["💼 Economy Analysis", "🎓 Education Analysis"],
+    "💼 Economy Analysis": ["🎓 Education Analysis", "👥 Employment & Age"],
+    "👥 Employment & Age": ["🎓 Education Analysis", "🗺️ Geographical Analysis"],
+    "🎓 Education Analysis": ["🗺️ Geographical Analysis", "🏥 Social Insurance"],
+    "🗺️ Geographical Analysis": ["🏥 Social Insurance", "📊 Summary Report"],
+    "🏥 Social Insurance": ["📊 Summary Report"],
+    "📊 Summary Report": [],
+}
+
+MAX_WORKERS = int(os.environ.get("PREFETCH_WORKERS", 2))
+# 1-minute load average per CPU above which no prefetch work runs
+MAX_LOAD = float(os.environ.get("PREFETCH_MAX_LOAD", 0.75))
+
+# Warmed keys remembered, so repeat visits don't queue finished work again
+_DONE_KEYS = 256
+
+
+def load_per_cpu():
+    """1-minute load average per CPU, or 0.0 where the platform doesn't report one."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return 0.0
+
+
+class Prefetcher:
+    """Bounded, cancellable pool running warm-up steps keyed by (section, data version, ...)."""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=8, max_load=MAX_LOAD):
+        self.max_pending = max_pending
+        self.max_load = max_load
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._tasks = {}  # key -> (sessions waiting on it, future, cancelled Event)
+        self._done = OrderedDict()
+        self._lock = threading.Lock()
+
+    def overloaded(self):
+        return self.max_load is not None and load_per_cpu() > self.max_load
+
+    def schedule(self, session, key, steps):
+        """Queue `steps` (callables, run in order) to warm `key` for `session`; returns whether it is queued.
+
+        If `key` is already being warmed, `session` joins the sessions waiting
+        on it instead. A task cancelled by every session it had, but still
+        unwinding, is replaced by a new one.
+        """
+        with self._lock:
+            if key in self._done:
+                return False
+            task = self._tasks.get(key)
+            if task is not None and not task[2].is_set():
+                task[0].add(session)
+                return True
+            if (task is None and len(self._tasks) >= self.max_pending) or self.overloaded():
+                return False
+            cancelled = threading.Event()
+            future = self._executor.submit(self._run, key, list(steps), cancelled)
+            self._tasks[key] = ({session}, future, cancelled)
+            return True
+
+    def cancel(self, session):
+        """Withdraw `session` from the work it is waiting on; returns how many tasks that stopped.
+
+        A task stops (dropped if queued, at its next step if running) once no
+        session is left waiting on it.
+        """
+        stopped = 0
+        with self._lock:
+            for key, (sessions, future, cancelled) in list(self._tasks.items()):
+                if session not in sessions:
+                    continue
+                sessions.discard(session)
+                if sessions or cancelled.is_set():
+                    continue
+                cancelled.set()
+                stopped += 1
+                if future.cancel():
+                    del self._tasks[key]
+        return stopped
+
+    def _run(self, key, steps, cancelled):
+        try:
+            with profiling.span("prefetch", ":".join(map(str, key))):
+                for step in steps:
+                    if cancelled.is_set() or self.overloaded():
+                        return
+                    try:
+                        step()
+                    except Exception:
+                        return
+            with self._lock:
+                self._done[key] = True
+                while len(self._done) > _DONE_KEYS:
+                    self._done.popitem(last=False)
+        finally:
+            with self._lock:
+                # Unless a new task took the key over after this one was cancelled
+                if key in self._tasks and self._tasks[key][2] is cancelled:
+                    del self._tasks[key]
+
+    def stats(self):
+        with self._lock:
+            return {"pending": len(self._tasks), "warmed": len(self._done)}
+
+    def shutdown(self):
+        with self._lock:
+            for _, future, cancelled in self._tasks.values():
+                cancelled.set()
+                future.cancel()
+        self._executor.shutdown(wait=False)
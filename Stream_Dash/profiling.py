@@ -0,0 +1,209 @@
+"""Opt-in timing spans for the dashboard.
+
+With DASHBOARD_PROFILE=1, each database query, pandas aggregation, section
+computation and chart render is timed as a span. Spans of the current rerun
+feed the app's "Performance" sidebar panel, every span is appended to a
+JSON-lines log (PROFILE_LOG), and recent durations per span are kept in
+memory for p50/p95 across all sessions of the process.
+
+Disabled, span() hands back one shared no-op context manager, so an
+instrumented call costs a function call and an attribute check.
+
+    python profiling.py [log]    # p50/p95 per span from a log, across runs
+"""
+import argparse
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+ENABLED = os.environ.get("DASHBOARD_PROFILE", "") not in ("", "0")
+PROFILE_LOG = os.environ.get(
+    "PROFILE_LOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles", "spans.jsonl")
+)
+
+# Durations kept per span for the in-process percentiles
+WINDOW = 500
+
+Span = namedtuple("Span", ["kind", "name", "seconds"])
+
+_NULL = contextlib.nullcontext()
+_run = contextvars.ContextVar("profiling_run", default=None)
+_run_ids = itertools.count(1)
+
+
+class Run:
+    """Spans recorded during one rerun of the script."""
+
+    def __init__(self, label):
+        self.id = f"{os.getpid()}-{next(_run_ids)}"
+        self.label = label
+        self.start = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def frame(self):
+        with self._lock:
+            spans = list(self.spans)
+        df = pd.DataFrame(spans, columns=Span._fields)
+        return df.assign(ms=(df.pop("seconds") * 1000).round(1))
+
+
+class _Stats:
+    def __init__(self, window=WINDOW):
+        self._durations = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self._durations[span.kind, span.name].append(span.seconds)
+
+    def frame(self):
+        with self._lock:
+            durations = {key: np.array(values) for key, values in self._durations.items()}
+        return summarize(durations)
+
+    def clear(self):
+        with self._lock:
+            self._durations.clear()
+
+
+class _Log:
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, run, span):
+        record = {
+            "ts": round(time.time(), 3),
+            "run": run.id if run else None,
+            "section": run.label if run else None,
+            "kind": span.kind,
+            "name": span.name,
+            "ms": round(span.seconds * 1000, 3),
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(line)
+            except OSError:
+                pass  # profiling must never take the page down
+
+
+stats = _Stats()
+_log = _Log(PROFILE_LOG)
+
+
+class _Timer:
+    __slots__ = ("kind", "name", "start")
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(Span(self.kind, self.name, time.perf_counter() - self.start))
+        return False
+
+
+def span(kind, name):
+    """Context manager timing a block as a `kind` span (query, aggregate, compute, render, ...)."""
+    if not ENABLED:
+        return _NULL
+    return _Timer(kind, name)
+
+
+def record(span):
+    run = _run.get()
+    if run is not None:
+        run.add(span)
+    stats.add(span)
+    _log.write(run, span)
+
+
+def start_run(label):
+    """Begin collecting spans for a rerun; returns the Run, or None when profiling is off."""
+    if not ENABLED:
+        return None
+    run = Run(label)
+    _run.set(run)
+    return run
+
+
+def finish_run(run):
+    """Record the whole rerun as a span and stop collecting into it; returns that span."""
+    if run is None:
+        return None
+    span = Span("rerun", run.label, time.perf_counter() - run.start)
+    record(span)
+    _run.set(None)
+    return span
+
+
+def bind(function):
+    """function wrapped to record its spans into the caller's rerun when run on a worker thread."""
+    run = _run.get()
+    if run is None:
+        return function
+
+    def bound(*args, **kwargs):
+        token = _run.set(run)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _run.reset(token)
+
+    return bound
+
+
+def summarize(durations):
+    """{(kind, name): seconds array} -> DataFrame of count, p50 and p95 in ms, slowest p95 first."""
+    rows = [
+        (kind, name, len(values), np.percentile(values, 50) * 1000, np.percentile(values, 95) * 1000)
+        for (kind, name), values in durations.items() if len(values)
+    ]
+    df = pd.DataFrame(rows, columns=["kind", "name", "count", "p50_ms", "p95_ms"])
+    return df.sort_values("p95_ms", ascending=False, ignore_index=True).round(1)
+
+
+def read_log(path=PROFILE_LOG):
+    with open(path, encoding="utf-8") as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p50/p95 per span from a profiling log")
+    parser.add_argument("log", nargs="?", default=PROFILE_LOG)
+    parser.add_argument("--kind", help="only spans of this kind")
+    args = parser.parse_args()
+
+    spans = read_log(args.log)
+    if args.kind:
+        spans = spans[spans["kind"] == args.kind]
+    durations = {key: group["ms"].to_numpy() / 1000 for key, group in spans.groupby(["kind", "name"])}
+    print(f"{len(spans):,} spans from {spans['run'].nunique():,} reruns")
+    print(summarize(durations).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Monte Carlo projections of the README's 2030 targets, per governorate and gender.
+
+The README asks what it takes to reach, by 2030:
+
+- 10% more registered freelancers (workers self-employed inside the home);
+- 60% of freelancers holding a high-skill qualification;
+- a 20% female share of the employed.
+
+seeds() takes the starting point from the dashboard rollups. main_job_sectors
+has no governorate, so the national freelancer count of each gender is spread
+over the governorates in proportion to their employed of that gender. The
+certified share of a governorate x gender is its share of University and
+Postgraduate education; a governorate the education table doesn't cover
+gets its gender's national share.
+
+project() draws every scenario at once as (scenario, year, governorate,
+gender) arrays. Yearly growth is lognormal with the given mean rate, and
+`correlation` of each year's shock is national rather than local. Each year a
+random fraction of the still-uncertified freelancers qualifies. The result
+is percentile bands per year, the chance of reaching each target, and the
+freelancer bands per governorate in the final year. Params is hashable, so a
+projection can be cached per data version and parameter set.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import geo
+from analysis_queries import FREELANCE_SECTOR
+
+
+TARGET_YEAR = 2030
+# Year the seed tables describe
+BASE_YEAR = 2017
+GENDERS = ('Male', 'Female')
+HIGH_SKILL_LEVELS = ['University', 'Postgraduate']
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Measure -> (title, target in TARGET_YEAR); freelancer_growth is relative to the base year
+TARGETS = {
+    'freelancer_growth': ("Registered freelancers, growth since base year", 0.10),
+    'certified_share': ("Freelancers with a high-skill qualification", 0.60),
+    'female_share': ("Female share of the employed", 0.20),
+}
+
+Seeds = namedtuple("Seeds", [
+    "governorates",     # Index of governorate names, the rows of the arrays below
+    "freelancers",      # governorate x gender (GENDERS) freelancers
+    "certified_share",  # governorate x gender share with a high-skill qualification
+    "employed",         # governorate x gender employed
+])
+
+Params = namedtuple("Params", [
+    "scenarios",
+    "base_year",
+    "freelancer_growth",         # mean yearly growth of freelancers
+    "freelancer_volatility",     # standard deviation of its log
+    "certification_rate",        # mean yearly fraction of uncertified freelancers who qualify
+    "certification_volatility",
+    "male_growth",               # mean yearly growth of the employed, per gender
+    "female_growth",
+    "employment_volatility",
+    "correlation",               # share of each year's shock that is national
+    "seed",
+], defaults=[2000, BASE_YEAR, 0.01, 0.03, 0.03, 0.01, 0.01, 0.03, 0.01, 0.6, 0])
+
+Projection = namedtuple("Projection", [
+    "bands",         # measure, year, p5 ... p95 (fractions)
+    "odds",          # {measure: chance of reaching its target by TARGET_YEAR}
+    "governorates",  # Governorate, Gender_Type, baseline, p5 ... p95 freelancers in TARGET_YEAR
+])
+
+
+def _by_governorate_gender(located, values):
+    # Gov_key x GENDERS sums of `values` over located rows
+    return values.groupby([located['Gov_key'], located['Gender_Type'].astype(object)]).sum().unstack(
+        fill_value=0
+    ).reindex(columns=list(GENDERS), fill_value=0)
+
+
+def seeds(freelancers, education, employment):
+    """Seeds from the freelancer (Sector x Gender_Type), education and employment (Governorate x Gender_Type) rollups.
+
+    The education rollup is by Governorate, Gender_Type and Status, enriched with Education_Level.
+    """
+    located = geo.locate(employment)
+    employed = _by_governorate_gender(located, located['Total'])
+    employed = employed[employed.sum(axis=1) > 0]
+
+    sectors = freelancers[freelancers['Sector'] == FREELANCE_SECTOR]
+    national = sectors.groupby(sectors['Gender_Type'].astype(object))['Total'].sum().reindex(list(GENDERS), fill_value=0)
+    gender_employed = employed.sum(axis=0).replace(0, 1)
+    freelancer_counts = employed / gender_employed * national
+
+    located = geo.locate(education)
+    high_skill = located['Total'].where(located['Education_Level'].isin(HIGH_SKILL_LEVELS), 0)
+    certified = _by_governorate_gender(located, high_skill).reindex(employed.index, fill_value=0)
+    population = _by_governorate_gender(located, located['Total']).reindex(employed.index, fill_value=0)
+    national_share = certified.sum(axis=0) / population.sum(axis=0).replace(0, 1)
+    share = (certified / population.where(population > 0)).fillna(national_share)
+
+    return Seeds(
+        pd.Index(geo.INDEX.loc[employed.index, 'Gov_Name'], name='Governorate'),
+        freelancer_counts.to_numpy(dtype="float64"),
+        share.to_numpy(dtype="float64"),
+        employed.to_numpy(dtype="float64"),
+    )
+
+
+def _shocks(rng, shape, correlation):
+    # Unit-variance normal shocks, `correlation` of them shared by every governorate and gender in a year.
+    # Everything stays float32 and in place: these arrays are the whole cost of a projection
+    shocks = rng.standard_normal(shape, dtype=np.float32)
+    shocks *= math.sqrt(1 - correlation ** 2)
+    shocks += correlation * rng.standard_normal((*shape[:2], 1, 1), dtype=np.float32)
+    return shocks
+
+
+def _growth(rng, shape, rate, volatility, correlation):
+    # Cumulative growth over the years axis; each year's factor is lognormal with mean 1 + rate
+    steps = _shocks(rng, shape, correlation)
+    steps *= volatility
+    steps += (np.log1p(rate) - volatility ** 2 / 2).astype(np.float32)
+    np.cumsum(steps, axis=1, out=steps)
+    return np.exp(steps, out=steps)
+
+
+def _bands(values):
+    # PERCENTILES over the scenarios axis
+    return np.percentile(values, PERCENTILES, axis=0)
+
+
+def project(seeds, params=Params()):
+    """Projection of `seeds` from params.base_year to TARGET_YEAR."""
+    years = np.arange(params.base_year + 1, TARGET_YEAR + 1)
+    if not len(years):
+        raise ValueError(f"base year {params.base_year} is not before {TARGET_YEAR}")
+    shape = (params.scenarios, len(years), *seeds.freelancers.shape)
+    rng = np.random.default_rng(params.seed)
+
+    freelancers = _growth(rng, shape, params.freelancer_growth, params.freelancer_volatility, params.correlation)
+    freelancers *= seeds.freelancers.astype(np.float32)
+    # Fraction of each cell's freelancers still uncertified: (1 - base share) x product of (1 - yearly rate)
+    uncertified = _shocks(rng, shape, params.correlation)
+    uncertified *= params.certification_volatility
+    uncertified += params.certification_rate
+    np.clip(uncertified, 0, 1, out=uncertified)
+    np.subtract(1, uncertified, out=uncertified)
+    np.cumprod(uncertified, axis=1, out=uncertified)
+    uncertified *= (1 - seeds.certified_share).astype(np.float32)
+    employed = _growth(
+        rng, shape, np.array([params.male_growth, params.female_growth]), params.employment_volatility,
+        params.correlation,
+    )
+    employed *= seeds.employed.astype(np.float32)
+
+    # scenario x year national measures
+    total_freelancers = freelancers.sum(axis=(2, 3))
+    measures = {
+        'freelancer_growth': total_freelancers / seeds.freelancers.sum() - 1,
+        'certified_share': 1 - (freelancers * uncertified).sum(axis=(2, 3)) / total_freelancers,
+        'female_share': employed[..., GENDERS.index('Female')].sum(axis=2) / employed.sum(axis=(2, 3)),
+    }
+
+    columns = [f"p{p}" for p in PERCENTILES]
+    bands = pd.concat([
+        pd.DataFrame(_bands(values).T, columns=columns).assign(measure=measure, year=years)
+        for measure, values in measures.items()
+    ], ignore_index=True)[['measure', 'year', *columns]]
+    odds = {measure: float((values[:, -1] >= TARGETS[measure][1]).mean()) for measure, values in measures.items()}
+
+    final = _bands(freelancers[:, -1]).reshape(len(PERCENTILES), -1).T
+    governorates = pd.DataFrame(final, columns=columns)
+    governorates.insert(0, 'baseline', seeds.freelancers.ravel())
+    governorates.insert(0, 'Gender_Type', np.tile(GENDERS, len(seeds.governorates)))
+    governorates.insert(0, 'Governorate', np.repeat(seeds.governorates.to_numpy(), len(GENDERS)))
+    return Projection(bands, odds, governorates)
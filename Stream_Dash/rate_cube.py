@@ -0,0 +1,217 @@
+"""Employment-rate cube: the operating percentage (Analysis Queries.sql, query 4), kept up to date.
+
+Query 4 joins PopAndAge with EmpAndAge on governorate, age group and gender
+and divides the summed employees by the summed population. Here the join is
+materialized once into dense Governorate x Age_Range x Gender_Type arrays:
+per cell, each table's summed Total and row count, and from them the
+cell's joined employees and population (each side's sum times the other
+side's row count, as the join's row pairs add up). The sums over every subset
+of the three dimensions are kept alongside, so the rate for any grouping or
+slice is a lookup and a division, not a join.
+
+The dashboard only sees changed data by reloading the tables, so that is
+what the cube follows: refresh() takes the reloaded tables, compares their
+per-cell sums and counts with the cube's (one vectorized pass over the rows),
+and recomputes only the cells that differ, adding their differences into the
+maintained sums instead of rebuilding them.
+
+    cube = EmploymentRateCube.from_frames(pop_age, emp_age)
+    cube.rates(['Age_Range'], Governorate='Cairo')
+    cube.refresh(pop_age, emp_age)   # after a reload
+"""
+import threading
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from analysis_queries import EXCLUDED_POPULATION_AGE, percentage
+
+
+DIMENSION_COLUMNS = ('Governorate', 'Age_Range', 'Gender_Type')
+
+# Maintained per subset of the dimensions: joined employees, joined population, joined row pairs
+MEASURES = ('total_employees', 'total_population', 'pairs')
+
+
+def _cell_totals(df, labels):
+    # Summed Total and row count of `df` per cell of `labels`; rows with a label not in them are left out
+    shape = tuple(len(labels[dim]) for dim in DIMENSION_COLUMNS)
+    codes = np.array([labels[dim].get_indexer(df[dim].astype(object)) for dim in DIMENSION_COLUMNS])
+    present = (codes >= 0).all(axis=0)
+    cells = np.ravel_multi_index(tuple(codes[:, present]), shape)
+    totals = pd.to_numeric(df['Total'], errors="coerce").fillna(0).to_numpy()[present]
+    size = int(np.prod(shape))
+    sums = np.bincount(cells, weights=totals, minlength=size).round().astype("int64").reshape(shape)
+    counts = np.bincount(cells, minlength=size).reshape(shape)
+    return sums, counts
+
+
+class EmploymentRateCube:
+    """Joined PopAndAge/EmpAndAge totals per governorate, age group and gender, updatable in place."""
+
+    def __init__(self, labels, sums, counts):
+        # labels: {dimension: labels}; sums, counts: {'pop_age' | 'emp_age': array over DIMENSION_COLUMNS}
+        self.labels = {dim: pd.Index(labels[dim], dtype=object, name=dim) for dim in DIMENSION_COLUMNS}
+        self._sums = sums
+        self._counts = counts
+        self._lock = threading.Lock()
+        self._rebuild()
+
+    @classmethod
+    def from_frames(cls, pop_age, emp_age):
+        """Cube over the flat PopAndAge and EmpAndAge rows; rows with a missing label are left out."""
+        frames = {'pop_age': pop_age, 'emp_age': emp_age}
+        labels = {
+            dim: pd.Index(pd.concat([df[dim].astype(object) for df in frames.values()]).dropna().unique()).sort_values()
+            for dim in DIMENSION_COLUMNS
+        }
+        sums, counts = {}, {}
+        for name, df in frames.items():
+            sums[name], counts[name] = _cell_totals(df, labels)
+        return cls(labels, sums, counts)
+
+    def _joined(self, cells=None):
+        # Employees, population and row pairs of the join at `cells` (flat indices), or everywhere
+        def at(array):
+            return array.ravel()[cells] if cells is not None else array
+
+        pop_sum, pop_count = at(self._sums['pop_age']), at(self._counts['pop_age'])
+        emp_sum, emp_count = at(self._sums['emp_age']), at(self._counts['emp_age'])
+        excluded = self._excluded_ages if cells is None else self._excluded_ages.ravel()[cells]
+        return (
+            np.where(excluded, 0, emp_sum * pop_count),
+            np.where(excluded, 0, pop_sum * emp_count),
+            np.where(excluded, 0, pop_count * emp_count),
+        )
+
+    def _rebuild(self):
+        ages = self.labels['Age_Range'] == EXCLUDED_POPULATION_AGE
+        self._excluded_ages = np.broadcast_to(ages[None, :, None], self._shape())
+        joined = self._joined()
+        self._rollups = {}
+        axes = range(len(DIMENSION_COLUMNS))
+        for size in range(len(DIMENSION_COLUMNS) + 1):
+            for keep in combinations(axes, size):
+                summed = tuple(axis for axis in axes if axis not in keep)
+                self._rollups[keep] = [np.asarray(measure.sum(axis=summed)) for measure in joined]
+
+    def _shape(self):
+        return tuple(len(self.labels[dim]) for dim in DIMENSION_COLUMNS)
+
+    def _grow(self, frames):
+        # Labels of `frames` not seen yet get empty cells; the maintained sums are rebuilt, which only happens
+        # on new labels
+        new_labels = {
+            dim: [
+                label for label in pd.unique(pd.concat([df[dim].astype(object) for df in frames]).dropna())
+                if label not in self.labels[dim]
+            ]
+            for dim in DIMENSION_COLUMNS
+        }
+        if not any(new_labels.values()):
+            return
+        pad = []
+        for dim in DIMENSION_COLUMNS:
+            self.labels[dim] = self.labels[dim].append(pd.Index(new_labels.get(dim, []), dtype=object, name=dim))
+            pad.append((0, len(new_labels.get(dim, []))))
+        for arrays in (self._sums, self._counts):
+            for name in arrays:
+                arrays[name] = np.pad(arrays[name], pad)
+        self._rebuild()
+
+    def refresh(self, pop_age, emp_age):
+        """Bring the cube up to date with reloaded PopAndAge and EmpAndAge rows; returns the number of cells recomputed.
+
+        Only the cells whose summed Total or row count changed are recomputed,
+        so a reload that touched a few rows costs a few cells, not a rebuild.
+        """
+        frames = {'pop_age': pop_age, 'emp_age': emp_age}
+        changed = 0
+        with self._lock:
+            self._grow(list(frames.values()))
+            for dataset, df in frames.items():
+                sums, counts = _cell_totals(df, self.labels)
+                cells = np.flatnonzero((sums != self._sums[dataset]) | (counts != self._counts[dataset]))
+                codes = np.unravel_index(cells, self._shape())
+                changed += self._update(dataset, codes, sums.ravel()[cells], counts.ravel()[cells])
+        return changed
+
+    def _update(self, dataset, codes, sums, counts):
+        # Set `dataset`'s sums and counts at the cells `codes` (one array per dimension, no repeats) and add the
+        # joined differences into the maintained rollups; the lock is held by the caller
+        cells = np.ravel_multi_index(codes, self._shape())
+        before = self._joined(cells)
+        self._sums[dataset].ravel()[cells] = sums
+        self._counts[dataset].ravel()[cells] = counts
+        after = self._joined(cells)
+        deltas = [new - old for new, old in zip(after, before)]
+        for keep, rollups in self._rollups.items():
+            position = tuple(codes[axis] for axis in keep)
+            for rollup, delta in zip(rollups, deltas):
+                if keep:
+                    np.add.at(rollup, position, delta)
+                else:
+                    rollup += delta.sum()
+        return len(cells)
+
+    def rates(self, group_by=('Governorate', 'Age_Range'), **selection):
+        """total_employees, total_population and operating_percentage by `group_by`, over the selected labels.
+
+        A selection value is one label or a list of them. Groups with no joined
+        rows are left out, as the join leaves them out; with the default
+        grouping and no selection this is query 4's result.
+        """
+        group_by = list(group_by)
+        unknown = set(group_by) - set(DIMENSION_COLUMNS)
+        if unknown:
+            raise KeyError(f"cannot group by {sorted(unknown)}")
+        keep = tuple(sorted(DIMENSION_COLUMNS.index(dim) for dim in group_by))
+        with self._lock:
+            if selection:
+                measures, labels = self._selected(keep, selection)
+            else:
+                measures = [rollup.copy() for rollup in self._rollups[keep]]
+                labels = [self.labels[DIMENSION_COLUMNS[axis]] for axis in keep]
+
+        if not keep:
+            frame = pd.DataFrame({name: [int(measure)] for name, measure in zip(MEASURES, measures)})
+        else:
+            index = pd.MultiIndex.from_product(labels)
+            frame = pd.DataFrame({name: measure.ravel() for name, measure in zip(MEASURES, measures)}, index=index)
+            frame = frame[frame['pairs'] > 0].reset_index()
+        population = frame['total_population'].to_numpy()
+        frame = frame.drop(columns='pairs').assign(operating_percentage=np.where(
+            population > 0, percentage(frame['total_employees'], population), 0.0
+        ))
+        if keep:
+            frame = frame[[*group_by, 'total_employees', 'total_population', 'operating_percentage']]
+            frame = frame.sort_values(group_by, ignore_index=True)
+        return frame
+
+    def _selected(self, keep, selection):
+        # The joined cells restricted to the selection, summed over the axes not kept
+        index = []
+        for dim in DIMENSION_COLUMNS:
+            if dim not in selection:
+                index.append(slice(None))
+                continue
+            chosen = selection[dim] if isinstance(selection[dim], (list, tuple, set)) else [selection[dim]]
+            positions = self.labels[dim].get_indexer(list(chosen))
+            if (positions < 0).any():
+                raise KeyError(f"unknown {dim}: {selection[dim]}")
+            index.append(positions)
+        summed = tuple(axis for axis in range(len(DIMENSION_COLUMNS)) if axis not in keep)
+        measures = []
+        for measure in self._joined():
+            for axis, selector in enumerate(index):
+                if not isinstance(selector, slice):
+                    measure = np.take(measure, selector, axis=axis)
+            measures.append(measure.sum(axis=summed))
+        # A kept dimension that is also selected only has the selected labels
+        labels = [self.labels[DIMENSION_COLUMNS[axis]][index[axis]] for axis in keep]
+        return measures, labels
+
+    def rate(self, **selection):
+        """Operating percentage of everything selected, e.g. rate(Governorate='Cairo', Gender_Type='Female')."""
+        return self.rates([], **selection)['operating_percentage'].item()
@@ -0,0 +1,204 @@
+"""Versioned on-disk snapshot of the dashboard datasets.
+
+Each version is a directory of uncompressed Arrow IPC (Feather v2) files, one
+per dataset, plus a manifest. Uncompressed Arrow files are read without a
+decode step, so serving a snapshot costs a local file read and the conversion
+to pandas instead of an ODBC round trip.
+
+    snapshots/
+        CURRENT                 <- name of the active version
+        20250101T120000.123456789-1a2b/
+            manifest.json
+            economy.arrow
+            ...
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from lazy_imports import LazyModule
+
+
+# Only needed once a table is read or written; row counts come from the manifest
+feather = LazyModule("pyarrow.feather")
+
+
+SNAPSHOT_ROOT = os.environ.get(
+    "SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+)
+MAX_AGE_SECONDS = int(os.environ.get("SNAPSHOT_MAX_AGE", 24 * 60 * 60))
+KEEP_VERSIONS = 3
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+FORMAT = 1
+
+_write_lock = threading.Lock()
+
+
+def _version_dir(version):
+    return os.path.join(SNAPSHOT_ROOT, version)
+
+
+def current_version():
+    try:
+        with open(os.path.join(SNAPSHOT_ROOT, CURRENT_FILE), encoding="utf-8") as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version if version and os.path.isdir(_version_dir(version)) else None
+
+
+def read_manifest(version=None):
+    version = version or current_version()
+    if version is None:
+        return None
+    try:
+        with open(os.path.join(_version_dir(version), MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == FORMAT else None
+
+
+def is_fresh(name=None, source=None, max_age=MAX_AGE_SECONDS):
+    """True if the current snapshot is young enough and (optionally) holds dataset `name` read from `source`."""
+    manifest = read_manifest()
+    if manifest is None or manifest.get("invalidated"):
+        return False
+    if source is not None and manifest.get("source") != source:
+        return False
+    if name is not None and name not in manifest["datasets"]:
+        return False
+    return time.time() - manifest["created_at"] < max_age
+
+
+def row_counts(source=None):
+    """{dataset: rows} recorded in a fresh snapshot, without reading any data."""
+    manifest = read_manifest() if is_fresh(source=source) else None
+    return {name: info["rows"] for name, info in manifest["datasets"].items()} if manifest else {}
+
+
+def _read_frame(version, name):
+    return feather.read_table(os.path.join(_version_dir(version), f"{name}.arrow")).to_pandas()
+
+
+def read_snapshot(version=None):
+    """Return {dataset: DataFrame} for a snapshot version (default: current), or None."""
+    manifest = read_manifest(version)
+    if manifest is None:
+        return None
+    return {name: _read_frame(manifest["version"], name) for name in manifest["datasets"]}
+
+
+def read_table(name, source=None):
+    """Return dataset `name` from the newest version that holds it (read from `source`), or None."""
+    for version in _versions(newest_first=True):
+        manifest = read_manifest(version)
+        if manifest is None or (source is not None and manifest.get("source") != source):
+            continue
+        if name in manifest["datasets"]:
+            return _read_frame(version, name)
+    return None
+
+
+def write_snapshot(frames, source=None, timings=None, memory=None):
+    """Write frames as a new version and make it current. Returns the version name."""
+    os.makedirs(SNAPSHOT_ROOT, exist_ok=True)
+    now = time.time_ns()
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(now // 10**9))
+    version = f"{stamp}.{now % 10**9:09d}-{uuid.uuid4().hex[:4]}"
+    staging = _version_dir(f".{version}.tmp")
+    os.makedirs(staging)
+    try:
+        for name, df in frames.items():
+            feather.write_feather(
+                df.reset_index(drop=True), os.path.join(staging, f"{name}.arrow"), compression="uncompressed"
+            )
+        manifest = {
+            "format": FORMAT,
+            "version": version,
+            "created_at": time.time(),
+            "source": source,
+            "load_timings": timings,
+            "memory": memory,
+            "datasets": {name: {"rows": len(df), "columns": list(df.columns)} for name, df in frames.items()},
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(staging, _version_dir(version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _set_current(version)
+    _prune()
+    return version
+
+
+def write_tables(frames, source=None, timings=None, memory=None):
+    """Add frames to the current snapshot while it is fresh and from `source`, otherwise start a new version."""
+    with _write_lock:
+        manifest = read_manifest() if is_fresh(source=source) else None
+        if manifest is None:
+            return write_snapshot(frames, source=source, timings=timings, memory=memory)
+
+        folder = _version_dir(manifest["version"])
+        for name, df in frames.items():
+            path = os.path.join(folder, f"{name}.arrow")
+            feather.write_feather(df.reset_index(drop=True), path + ".tmp", compression="uncompressed")
+            os.replace(path + ".tmp", path)
+            manifest["datasets"][name] = {"rows": len(df), "columns": list(df.columns)}
+        if timings:
+            manifest["load_timings"] = {**(manifest.get("load_timings") or {}), **timings}
+        if memory:
+            manifest["memory"] = {**(manifest.get("memory") or {}), **memory}
+        _write_manifest(manifest)
+        return manifest["version"]
+
+
+def invalidate():
+    """Mark the current snapshot stale so the next load refreshes from the database.
+
+    The files are kept so they can still be served if the refresh fails.
+    """
+    manifest = read_manifest()
+    if manifest is None:
+        return
+    manifest["invalidated"] = True
+    _write_manifest(manifest)
+
+
+def _write_manifest(manifest):
+    path = os.path.join(_version_dir(manifest["version"]), MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _set_current(version):
+    tmp = os.path.join(SNAPSHOT_ROOT, CURRENT_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(SNAPSHOT_ROOT, CURRENT_FILE))
+
+
+def _versions(newest_first=False):
+    if not os.path.isdir(SNAPSHOT_ROOT):
+        return []
+    names = [
+        name for name in os.listdir(SNAPSHOT_ROOT)
+        if not name.startswith(".") and os.path.isdir(_version_dir(name))
+    ]
+    # Version names start with a sortable timestamp
+    return sorted(names, reverse=newest_first)
+
+
+def _prune():
+    current = current_version()
+    for name in _versions()[:-KEEP_VERSIONS]:
+        if name != current:
+            shutil.rmtree(_version_dir(name), ignore_errors=True)
@@ -0,0 +1,190 @@
+"""Dimension and fact tables of the Employment_in_Egypt star schema.
+
+Does what `Techmical Codes/Connecting_Queries.sql` does, in pandas: each
+dimension numbers the distinct labels found in the flat tables, and each fact
+table swaps the flat table's labels for dimension ids. Instead of joining on
+LTRIM(RTRIM(label)) for every fact row, each label column is factorized once
+and its distinct labels looked up in the dimension, so the per-row work is an
+integer take. The tables come out as DataFrames, written to any backend with
+its bulk write_frame.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+# Dimension table, its id column, its label column, and the (flat table, column)
+# pairs its labels are collected from
+Dimension = namedtuple("Dimension", ["table", "id", "label", "sources"])
+
+DIMENSIONS = {
+    dim.table: dim for dim in [
+        Dimension('Governorates', 'Gov_id', 'Gov_Name', [
+            ('Emp&Age', 'Governorate'), ('PopAndAge', 'Governorate'), ('Educational_Status', 'Governorate'),
+            ('NatureOfWork', 'Governorate'), ('Social_Insurance', 'Governorate'),
+        ]),
+        Dimension('Gender', 'Gender_id', 'Gender_Type', [
+            ('Emp&Age', 'Gender_Type'), ('PopAndAge', 'Gender_Type'), ('EconomyAndAge', 'Gender_Type'),
+        ]),
+        Dimension('Age_Group', 'AgeGroup_id', 'Age_Range', [
+            ('PopAndAge', 'Age_Range'), ('Emp&Age', 'Age_Range'), ('EconomyAndAge', 'Age_Range'),
+            ('MainjobsSecAndAge', 'Age_Range'), ('Sector&Age', 'Age_Range'),
+        ]),
+        Dimension('Educational', 'EduStatus_id', 'Status', [('Educational_Status', 'Status')]),
+        Dimension('Employment_Type', 'NatureOfWork_id', 'NatureOfWork_Name', [('NatureOfWork', 'Employment_Type_Name')]),
+        Dimension('Economy', 'Economy_id', 'Economy_Type', [
+            ('EconomyAndAge', 'Economy_Type'), ('Economy_And_LifeOfWork', 'Economy_Type'),
+        ]),
+        Dimension('Area_Type', 'AreaType_id', 'Area_Type', [('EconomyAndAge', 'Area_Type')]),
+        Dimension('Sector', 'Sector_id', 'Sector_Name', [('Sector&Age', 'Sector_Name'), ('MainJobAndSectors', 'Sector')]),
+        Dimension('Insurance', 'Insurance_id', 'Insurance_Type', [('Social_Insurance', 'Insurance_Type')]),
+        Dimension('Main_Jobs', 'MainJob_id', 'Occupation_Type', [('MainjobsSecAndAge', 'Occupation_Type')]),
+    ]
+}
+
+# Fact table, the flat table it is built from, and (dimension, flat column) keys
+Fact = namedtuple("Fact", ["table", "flat", "keys"])
+
+FACTS = {
+    fact.table: fact for fact in [
+        Fact('EmpAndAge_Fact', 'Emp&Age', [
+            ('Governorates', 'Governorate'), ('Gender', 'Gender_Type'), ('Age_Group', 'Age_Range'),
+        ]),
+        Fact('PopAndAge_Fact', 'PopAndAge', [
+            ('Governorates', 'Governorate'), ('Gender', 'Gender_Type'), ('Age_Group', 'Age_Range'),
+        ]),
+        Fact('Educational_Status_Fact', 'Educational_Status', [
+            ('Governorates', 'Governorate'), ('Gender', 'Gender_Type'), ('Educational', 'Status'),
+        ]),
+        Fact('NatureOfWork_Fact', 'NatureOfWork', [
+            ('Employment_Type', 'Employment_Type_Name'), ('Gender', 'Gender_Type'), ('Governorates', 'Governorate'),
+        ]),
+        Fact('EconomyAndAge_Fact', 'EconomyAndAge', [
+            ('Economy', 'Economy_Type'), ('Gender', 'Gender_Type'), ('Age_Group', 'Age_Range'), ('Area_Type', 'Area_Type'),
+        ]),
+        Fact('SectorAndAge_Fact', 'Sector&Age', [
+            ('Sector', 'Sector_Name'), ('Gender', 'Gender_Type'), ('Age_Group', 'Age_Range'),
+        ]),
+        Fact('Social_Insurance_Fact', 'Social_Insurance', [
+            ('Governorates', 'Governorate'), ('Gender', 'Gender_Type'), ('Insurance', 'Insurance_Type'),
+        ]),
+        Fact('MainJobsSecAndAge_Fact', 'MainjobsSecAndAge', [
+            ('Main_Jobs', 'Occupation_Type'), ('Gender', 'Gender_Type'), ('Age_Group', 'Age_Range'),
+        ]),
+    ]
+}
+
+
+def _trimmed(values):
+    """(row codes, trimmed distinct labels) of a label column; missing values get code -1.
+
+    Only the distinct labels are trimmed, so this costs one pass of integer
+    codes over the rows however long the labels are.
+    """
+    codes, uniques = pd.factorize(values)
+    return codes, pd.Index(pd.Series(uniques, dtype=object).astype(str).str.strip())
+
+
+def build_dimensions(flat, dimensions=None, existing=None):
+    """{dimension table: DataFrame(id, label)} numbered from the distinct trimmed labels in `flat`.
+
+    `flat` maps flat table name -> DataFrame. Ids count from 1 in label order,
+    like ROW_NUMBER() OVER (ORDER BY label) in Connecting_Queries.sql. A
+    dimension with a table in `existing` keeps its ids instead: labels still
+    found keep theirs, new labels are numbered on from its highest id in label
+    order, and labels no longer found are dropped. Facts keyed on it then
+    stay valid unless its label set changed (see relabeled()).
+    """
+    tables = {}
+    for dim in DIMENSIONS.values():
+        if dimensions is not None and dim.table not in dimensions:
+            continue
+        labels = [_trimmed(flat[table][column])[1] for table, column in dim.sources if table in flat]
+        distinct = pd.Index([]).append(labels).unique() if labels else pd.Index([])
+        distinct = distinct[distinct != ""].sort_values()
+        current = (existing or {}).get(dim.table)
+        if current is None:
+            ids = np.arange(1, len(distinct) + 1, dtype="int32")
+        else:
+            kept = current[current[dim.label].isin(distinct)]
+            added = distinct[~distinct.isin(kept[dim.label])]
+            start = int(current[dim.id].max()) + 1 if len(current) else 1
+            ids = np.concatenate([kept[dim.id].to_numpy(dtype="int32"), np.arange(start, start + len(added), dtype="int32")])
+            distinct = pd.Index(kept[dim.label]).append(added)
+        tables[dim.table] = pd.DataFrame({dim.id: ids, dim.label: distinct.to_numpy(dtype=object)})
+    return tables
+
+
+def build_facts(flat, dimensions, facts=None):
+    """Swap each fact's flat labels for dimension ids.
+
+    Returns ({fact table: DataFrame(ids..., Total)}, {fact table: {column: [unmatched labels]}}).
+    Rows with a label missing from its dimension are left out, as the inner
+    joins in Connecting_Queries.sql leave them out, and reported.
+    """
+    tables, unmatched = {}, {}
+    for fact in FACTS.values():
+        if facts is not None and fact.table not in facts:
+            continue
+        rows = flat[fact.flat]
+        matched = np.ones(len(rows), dtype=bool)
+        columns, missing = {}, {}
+        for dim_table, column in fact.keys:
+            dim = DIMENSIONS[dim_table]
+            ids = dimensions[dim_table]
+            codes, labels = _trimmed(rows[column])
+            positions = pd.Index(ids[dim.label]).get_indexer(labels)
+            # Trailing -1 is what missing labels (code -1) pick up
+            label_ids = np.append(np.where(positions >= 0, ids[dim.id].to_numpy()[positions], -1), -1)
+            row_ids = label_ids[codes].astype("int32")
+            matched &= row_ids >= 0
+            columns[dim.id] = row_ids
+            lost = sorted(labels[positions < 0]) + (["<missing>"] if (codes < 0).any() else [])
+            if lost:
+                missing[column] = lost
+        columns["Total"] = rows["Total"].to_numpy()
+        tables[fact.table] = pd.DataFrame(columns)[matched].reset_index(drop=True)
+        if missing:
+            unmatched[fact.table] = missing
+    return tables, unmatched
+
+
+def build_star_schema(flat, dimensions=None, facts=None):
+    """(tables, unmatched): the dimension and fact tables built from `flat`, plus unmatched labels per fact.
+
+    Dimensions not being rebuilt but needed by a fact can be passed in
+    `flat` under their own table name (e.g. read back from the database).
+    """
+    dims = build_dimensions(flat, dimensions)
+    lookup = {**{table: flat[table] for table in DIMENSIONS if table in flat and table not in dims}, **dims}
+    fact_tables, unmatched = build_facts(flat, lookup, facts)
+    return {**dims, **fact_tables}, unmatched
+
+
+def affected_by(flat_tables, relabeled=None):
+    """(dimensions, facts) to rebuild after `flat_tables` changed.
+
+    A dimension is rebuilt when any of its source tables changed. The facts
+    built from a changed flat table are rebuilt, and so is every fact keyed on
+    a dimension in `relabeled`, whose label set changed: rows it couldn't
+    match may match now, or the label they matched is gone. Without
+    `relabeled`, every rebuilt dimension counts as relabeled, as its ids are
+    renumbered when it is built from scratch.
+    """
+    flat_tables = set(flat_tables)
+    dims = [dim.table for dim in DIMENSIONS.values() if {table for table, _ in dim.sources} & flat_tables]
+    relabeled = set(dims if relabeled is None else relabeled)
+    facts = [
+        fact.table for fact in FACTS.values()
+        if fact.flat in flat_tables or {dim for dim, _ in fact.keys} & relabeled
+    ]
+    return dims, facts
+
+
+def relabeled(before, after):
+    """Dimensions in `after` ({dimension table: DataFrame}) whose labels differ from their table in `before`."""
+    return [
+        table for table, df in after.items()
+        if table not in before or set(before[table][DIMENSIONS[table].label]) != set(df[DIMENSIONS[table].label])
+    ]
@@ -0,0 +1,227 @@
+"""Streaming reader for large .xlsx workbooks.
+
+`pd.read_excel` loads the whole workbook into openpyxl's cell model before the
+first row comes out, so parse time and peak memory grow with the file. Here
+the sheet is read with openpyxl in read-only mode, which parses the sheet XML
+as it is iterated, and rows are turned into DataFrames `batch_size` at a time;
+memory is bounded by one batch whatever the size of the sheet.
+
+Columns are typed as pd.read_excel types them: all numbers is float64, all
+dates is datetime64, all strings is text (str, with None for empty cells),
+and anything else keeps its cell values as they are in an object column
+("mixed"). A column with no values at all is float64 NaN, and trailing
+columns with neither a header nor a value are left out.
+
+read_sheet types each column over the whole sheet. iter_batches can only
+look at the rows read so far: a column keeps the type of the first batch it
+has values in until a later batch has a value that doesn't fit, and from
+then on is mixed. Nothing is coerced to NaN, but batches then differ in
+dtypes (or in width, when a later row is wider); with strict=True that
+raises SchemaChanged instead, carrying the schema to read the sheet again
+with, so the batches of that second pass all agree.
+
+CAPMAS sheets often start with title rows above the real header;
+`header="auto"` picks the header row (see detect_header).
+"""
+import datetime
+import itertools
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+BATCH_ROWS = 50_000
+
+# Rows looked at when detecting the header
+HEADER_SCAN_ROWS = 30
+
+# Columns of a sheet: how many, and {column: kind} (see _kind)
+Schema = namedtuple("Schema", ["width", "kinds"])
+
+
+class SchemaChanged(ValueError):
+    """A batch doesn't fit the dtypes or width of the batches already yielded; read again with `schema`."""
+
+    def __init__(self, schema):
+        super().__init__("a later batch changed the type or number of the sheet's columns")
+        self.schema = schema
+
+
+def _open(path):
+    from openpyxl import load_workbook
+
+    # data_only: formula cells give their cached value, like pd.read_excel
+    return load_workbook(path, read_only=True, data_only=True)
+
+
+def sheet_names(path):
+    workbook = _open(path)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def _trim(row):
+    end = len(row)
+    while end and (row[end - 1] is None or row[end - 1] == ""):
+        end -= 1
+    return row[:end]
+
+
+def _is_text(value):
+    return isinstance(value, str) and value.strip() != ""
+
+
+def detect_header(rows):
+    """Index of the header row among the first rows of a sheet.
+
+    The header is the first row whose filled cells are all text and cover at
+    least half the width of the widest row; title and note rows above it fill
+    one or two cells. Falls back to the first non-empty row.
+    """
+    filled = [sum(value is not None and value != "" for value in row) for row in rows]
+    widest = max(filled, default=0)
+    for i, row in enumerate(rows):
+        texts = sum(_is_text(value) for value in row)
+        if filled[i] and texts == filled[i] and texts >= max(1, math.ceil(widest / 2)):
+            return i
+    return next((i for i, count in enumerate(filled) if count), 0)
+
+
+def _column_names(row):
+    names, seen = [], {}
+    for i, value in enumerate(row):
+        name = str(value).strip() if value is not None and str(value).strip() else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _kind(values):
+    present = [value for value in values if value is not None]
+    if not present:
+        return None
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return "number"
+    if all(isinstance(value, (datetime.datetime, datetime.date)) for value in present):
+        return "datetime"
+    if all(isinstance(value, str) for value in present):
+        return "text"
+    return "mixed"
+
+
+def _typed(values, kind):
+    if kind is None:
+        return pd.Series(np.nan, index=range(len(values)), dtype="float64")
+    if kind == "number":
+        return pd.to_numeric(pd.Series(values, dtype=object)).astype("float64")
+    if kind == "datetime":
+        return pd.to_datetime(pd.Series(values, dtype=object))
+    if kind == "text":
+        return pd.Series(values, dtype=object)
+    # As pd.read_excel leaves a column of mixed values: the cell values, NaN where empty
+    return pd.Series([np.nan if value is None else value for value in values], dtype=object)
+
+
+class _Batcher:
+    def __init__(self, columns, numbered=False, schema=None):
+        self.columns = list(columns)
+        self.numbered = numbered
+        self.kinds = dict(schema.kinds) if schema else {}
+        if schema:
+            self.widen(schema.width)
+        self.yielded = False
+
+    def widen(self, width):
+        # Columns past the header are named like pandas names them
+        self.columns += [i if self.numbered else f"Unnamed: {i}" for i in range(len(self.columns), width)]
+
+    def schema(self):
+        return Schema(len(self.columns), dict(self.kinds))
+
+    def frame(self, rows, strict=False):
+        # Rows are trimmed, so the widest one ends at the last filled cell
+        width = max(len(self.columns), max(len(row) for row in rows))
+        changed = self.yielded and width > len(self.columns)
+        self.widen(width)
+        cells = np.full((len(rows), width), None, dtype=object)
+        for i, row in enumerate(rows):
+            cells[i, :len(row)] = row
+        values = {column: cells[:, j].tolist() for j, column in enumerate(self.columns)}
+        for column, column_values in values.items():
+            kind, seen = _kind(column_values), self.kinds.get(column)
+            if kind is None or kind == seen or seen == "mixed":
+                continue
+            # A column that already has another type can only hold both as mixed
+            self.kinds[column] = kind if seen is None else "mixed"
+            changed |= self.yielded
+        if strict and changed:
+            raise SchemaChanged(self.schema())
+        self.yielded = True
+        return pd.DataFrame({column: _typed(values[column], self.kinds.get(column)) for column in self.columns})
+
+
+def _row_batches(path, sheet, header, batch_size, schema=None):
+    # (batcher, rows) for every `batch_size` rows of the sheet after the header
+    workbook = _open(path)
+    try:
+        worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+        rows = (_trim(row) for row in worksheet.iter_rows(values_only=True))
+
+        head = []
+        if header is not None:
+            for row in rows:
+                head.append(row)
+                if len(head) >= (HEADER_SCAN_ROWS if header == "auto" else header + 1):
+                    break
+            position = detect_header(head) if header == "auto" else header
+            if position >= len(head):
+                return
+            batcher = _Batcher(_column_names(head[position]), schema=schema)
+            head = head[position + 1:]
+        else:
+            batcher = _Batcher([], numbered=True, schema=schema)
+
+        batch, blanks = [], 0
+        for row in itertools.chain(head, rows):
+            if not row:
+                blanks += 1  # only emitted once a filled row follows
+                continue
+            batch += [()] * blanks + [row]
+            blanks = 0
+            if batch_size is not None and len(batch) >= batch_size:
+                yield batcher, batch
+                batch = []
+        if batch:
+            yield batcher, batch
+    finally:
+        workbook.close()
+
+
+def iter_batches(path, sheet=0, header=0, batch_size=BATCH_ROWS, strict=False, schema=None):
+    """Yield the rows of `sheet` (index or name) as DataFrames of at most `batch_size` rows.
+
+    `header` is the index of the header row, "auto" to detect it, or None for
+    a sheet without one (columns are then numbered from 0). Empty rows are
+    kept as all-missing rows, except at the end of the sheet, as with
+    pd.read_excel. `strict` raises SchemaChanged rather than yield a batch
+    whose columns differ from the earlier ones; `schema` (from that error)
+    sets the columns up front.
+    """
+    for batcher, rows in _row_batches(path, sheet, header, batch_size, schema):
+        yield batcher.frame(rows, strict=strict)
+
+
+def read_sheet(path, sheet=0, header=0):
+    """The whole sheet as one DataFrame, each column typed over all its values."""
+    rows, batcher = [], None
+    for batcher, batch in _row_batches(path, sheet, header, None):
+        rows += batch
+    return batcher.frame(rows) if rows else pd.DataFrame()
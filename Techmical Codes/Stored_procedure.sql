@@ -59,3 +59,38 @@ BEGIN
       AND AreaType_id = @AreaType_id
 END
 GO
+---------------------------------------------------------------------------------
+--==================Bulk changes EconomyAndAge_Fact================================
+-- One call applies a whole batch: a NULL Total deletes the row with that key,
+-- otherwise it is updated, or inserted if the key is new.
+-- Stream_Dash/fact_changes.py does the same for every fact table from Python.
+CREATE TYPE EconomyAndAgeFactChanges AS TABLE (
+    Economy_id INT NOT NULL,
+    Gender_id INT NOT NULL,
+    AgeGroup_id INT NOT NULL,
+    AreaType_id INT NOT NULL,
+    Total INT NULL,
+    PRIMARY KEY (Economy_id, Gender_id, AgeGroup_id, AreaType_id)
+)
+GO
+---------------------------------------------------------------------------------
+CREATE PROCEDURE MergeEconomyAndAgeFact
+    @Changes EconomyAndAgeFactChanges READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE EconomyAndAge_Fact WITH (HOLDLOCK) AS t
+    USING @Changes AS s
+        ON t.Economy_id = s.Economy_id
+       AND t.Gender_id = s.Gender_id
+       AND t.AgeGroup_id = s.AgeGroup_id
+       AND t.AreaType_id = s.AreaType_id
+    WHEN MATCHED AND s.Total IS NULL THEN
+        DELETE
+    WHEN MATCHED THEN
+        UPDATE SET Total = s.Total
+    WHEN NOT MATCHED BY TARGET AND s.Total IS NOT NULL THEN
+        INSERT (Economy_id, Gender_id, AgeGroup_id, AreaType_id, Total)
+        VALUES (s.Economy_id, s.Gender_id, s.AgeGroup_id, s.AreaType_id, s.Total);
+END
+GO